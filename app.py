@@ -1,10 +1,19 @@
 import streamlit as st
 import os
-from typing import Optional
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple, BinaryIO
 from document_ingestion import extract_document_text
 from chunking_engine import chunk_document_text, get_chunk_count, get_chunk_summary
-from openai_editor import process_chunks_in_batches, get_editing_stats, load_system_prompt
-from pdf_generator import create_pdf_bytes, get_pdf_filename, get_pdf_stats
+from openai_editor import (
+    get_editing_stats,
+    load_system_prompt,
+    DEFAULT_MAX_REQUESTS_PER_MINUTE,
+    DEFAULT_MAX_TOKENS_PER_MINUTE,
+    DEFAULT_MAX_ATTEMPTS,
+    DEFAULT_PACK_SIZE
+)
 
 # Configure page
 st.set_page_config(
@@ -13,6 +22,136 @@ st.set_page_config(
     layout="wide"
 )
 
+# Number of characters shown for each entry in the entries list
+PREVIEW_LENGTH = 200
+
+# Matches editor progress messages such as "Edited 3/10 entries …"
+PROGRESS_RE = re.compile(r"Edited\s+(\d+)\s*/\s*(\d+)")
+
+# Minimum seconds between progress widget redraws (~10 updates per second)
+PROGRESS_UPDATE_INTERVAL = 0.1
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_extract_document_text(uploaded_file: BinaryIO, filename: str) -> Tuple[str, bool, str]:
+    """Extract text once per distinct upload; Streamlit hashes the file contents for the key."""
+    return extract_document_text(uploaded_file, filename)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_chunk_document_text(text: str, method: str, paragraphs_per_chunk: int) -> List[Dict]:
+    """Chunk extracted text once per distinct (text, method, paragraph count)."""
+    return chunk_document_text(text, method=method, paragraphs_per_chunk=paragraphs_per_chunk)
+
+
+@st.cache_resource
+def pdf_executor() -> ThreadPoolExecutor:
+    """Shared single-worker pool for building PDFs off the script thread."""
+    return ThreadPoolExecutor(max_workers=1)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_pdf(chunks: List[Dict], title: str) -> Tuple[bytes, int]:
+    """Build the PDF (and count its pages) once per distinct set of edited chunks instead of on every rerun."""
+    from pdf_generator import build_and_count
+    return build_and_count(chunks, title)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_pdf_stats(chunks: List[Dict]) -> Dict:
+    """Compute PDF statistics once per distinct set of edited chunks."""
+    from pdf_generator import get_pdf_stats
+    return get_pdf_stats(chunks)
+
+
+def add_previews(chunks: List[Dict]):
+    """Store a short text preview on each chunk once, instead of slicing on every rerun."""
+    for chunk in chunks:
+        text = chunk['text']
+        chunk['preview'] = text[:PREVIEW_LENGTH] + "..." if len(text) > PREVIEW_LENGTH else text
+
+
+def reset_system_prompt():
+    """Restore the default editing instructions."""
+    st.session_state.system_prompt = load_system_prompt()
+
+
+def chunking_settings_changed() -> bool:
+    """Check whether the pending chunking settings differ from the applied ones."""
+    method = st.session_state.pending_chunking_method
+    if method != st.session_state.chunking_method:
+        return True
+    # The paragraph count only affects the paragraph method
+    return (method == "paragraph"
+            and st.session_state.pending_paragraphs_per_chunk != st.session_state.paragraphs_per_chunk)
+
+
+def apply_chunking_settings():
+    """Apply the pending chunking settings, discarding chunks only if they actually changed."""
+    changed = chunking_settings_changed()
+    st.session_state.chunking_method = st.session_state.pending_chunking_method
+    st.session_state.paragraphs_per_chunk = st.session_state.pending_paragraphs_per_chunk
+    if changed:
+        reset_chunks()
+
+
+def complete_editing(edited_chunks: List[Dict]):
+    """Store finished edits and start building the PDF so it is ready by the time the download button renders."""
+    from pdf_generator import build_and_count
+    add_previews(edited_chunks)
+    st.session_state.edited_chunks = edited_chunks
+    st.session_state.editing_complete = True
+    st.session_state.pdf_future = pdf_executor().submit(
+        build_and_count, edited_chunks, "Enhanced Journal"
+    )
+
+
+def check_pending_batch():
+    """Check the submitted Batch API job once (never a blocking wait) and collect its results when done."""
+    from openai_editor import check_batch
+    
+    def update_status(message):
+        st.session_state.batch_status = message
+    
+    try:
+        edited_chunks = check_batch(
+            st.session_state.batch_id,
+            st.session_state.batch_chunks,
+            progress_callback=update_status
+        )
+    except Exception as e:
+        # Keep the batch id so the next check can still collect the paid results
+        st.session_state.batch_status = f"Could not check batch {st.session_state.batch_id}: {str(e)}"
+        return
+    
+    if edited_chunks is not None:
+        # The results belong to the chunks that were submitted, even if the document changed since
+        st.session_state.chunks = st.session_state.batch_chunks
+        st.session_state.batch_id = None
+        st.session_state.batch_chunks = []
+        complete_editing(edited_chunks)
+
+
+def cancel_pending_batch():
+    """Cancel the submitted Batch API job and stop waiting for it."""
+    from openai_editor import cancel_batch
+    try:
+        cancel_batch(st.session_state.batch_id)
+    except Exception as e:
+        print(f"Error cancelling batch: {str(e)}")
+    st.session_state.batch_id = None
+    st.session_state.batch_chunks = []
+
+
+def reset_chunks():
+    """Discard parsed and edited chunks after a chunking setting changes."""
+    if st.session_state.chunks:
+        st.session_state.chunks = []
+        st.session_state.edited_chunks = []
+        st.session_state.editing_complete = False
+        st.session_state.pdf_future = None
+
+
 def main():
     st.title("📝 AI Manuscript Editor")
     st.markdown("Transform your manuscript with AI-powered stylistic editing")
@@ -30,6 +169,8 @@ def main():
         st.session_state.edited_chunks = []
     if 'editing_complete' not in st.session_state:
         st.session_state.editing_complete = False
+    if 'pdf_future' not in st.session_state:
+        st.session_state.pdf_future = None
     if 'system_prompt' not in st.session_state:
         # Load default system prompt on first run
         st.session_state.system_prompt = load_system_prompt()
@@ -37,6 +178,47 @@ def main():
         st.session_state.chunking_method = "daily"
     if 'paragraphs_per_chunk' not in st.session_state:
         st.session_state.paragraphs_per_chunk = 3
+    if 'max_requests_per_minute' not in st.session_state:
+        st.session_state.max_requests_per_minute = DEFAULT_MAX_REQUESTS_PER_MINUTE
+    if 'max_tokens_per_minute' not in st.session_state:
+        st.session_state.max_tokens_per_minute = DEFAULT_MAX_TOKENS_PER_MINUTE
+    if 'max_attempts' not in st.session_state:
+        st.session_state.max_attempts = DEFAULT_MAX_ATTEMPTS
+    if 'pack_size' not in st.session_state:
+        st.session_state.pack_size = DEFAULT_PACK_SIZE
+    if 'editing_mode' not in st.session_state:
+        st.session_state.editing_mode = "Realtime"
+    if 'batch_id' not in st.session_state:
+        # A submitted Batch API job, kept across reruns until its results are collected
+        st.session_state.batch_id = None
+    if 'batch_chunks' not in st.session_state:
+        st.session_state.batch_chunks = []
+    if 'batch_status' not in st.session_state:
+        st.session_state.batch_status = ""
+    
+    # A pending batch is checked with one short request per rerun instead of blocking the script
+    if st.session_state.batch_id and not st.session_state.processing:
+        check_pending_batch()
+    
+    # Chunking widgets edit pending copies; they only take effect once applied
+    if 'pending_chunking_method' not in st.session_state:
+        st.session_state.pending_chunking_method = st.session_state.chunking_method
+    if 'pending_paragraphs_per_chunk' not in st.session_state:
+        st.session_state.pending_paragraphs_per_chunk = st.session_state.paragraphs_per_chunk
+    
+    # Keep the paragraph count while its widget is hidden (Streamlit drops state of unrendered widgets)
+    st.session_state.pending_paragraphs_per_chunk = st.session_state.pending_paragraphs_per_chunk
+    
+    # Completion statistics are computed once per rerun and shared by the sidebar and main area
+    if st.session_state.editing_complete and st.session_state.edited_chunks:
+        editing_stats = get_editing_stats(st.session_state.edited_chunks)
+        pdf_stats = cached_pdf_stats(st.session_state.edited_chunks)
+    else:
+        editing_stats = None
+        pdf_stats = None
+    
+    # Exact page count, known once the PDF has been built; until then the stats estimate is shown
+    pdf_pages = None
     
     # Sidebar
     with st.sidebar:
@@ -46,13 +228,12 @@ def main():
         api_key = st.text_input(
             "OpenAI API Key",
             type="password",
-            value=st.session_state.api_key,
+            key="api_key",
             disabled=st.session_state.processing,
             help="Enter your OpenAI API key to enable AI editing"
         )
         
         if api_key:
-            st.session_state.api_key = api_key
             os.environ["OPENAI_API_KEY"] = api_key
         
         st.divider()
@@ -74,62 +255,114 @@ def main():
             "Chunking Method",
             options=["daily", "paragraph"],
             format_func=lambda x: "By daily journal entry" if x == "daily" else "By paragraph",
-            index=0 if st.session_state.chunking_method == "daily" else 1,
+            key="pending_chunking_method",
             disabled=st.session_state.processing,
             help="Choose how to split your document into chunks for AI processing"
         )
         
-        # Update session state if method changed
-        if chunking_method != st.session_state.chunking_method:
-            st.session_state.chunking_method = chunking_method
-            # Reset chunks if method changed and we have existing chunks
-            if st.session_state.chunks:
-                st.session_state.chunks = []
-                st.session_state.edited_chunks = []
-                st.session_state.editing_complete = False
-        
         # Paragraph count field (only show if paragraph method selected)
         if chunking_method == "paragraph":
-            paragraphs_per_chunk = st.number_input(
+            st.number_input(
                 "Paragraphs per chunk",
                 min_value=1,
                 max_value=20,
-                value=st.session_state.paragraphs_per_chunk,
+                key="pending_paragraphs_per_chunk",
                 disabled=st.session_state.processing,
                 help="Number of paragraphs to include in each chunk"
             )
-            
-            # Update session state if count changed
-            if paragraphs_per_chunk != st.session_state.paragraphs_per_chunk:
-                st.session_state.paragraphs_per_chunk = paragraphs_per_chunk
-                # Reset chunks if count changed and we have existing chunks
-                if st.session_state.chunks:
-                    st.session_state.chunks = []
-                    st.session_state.edited_chunks = []
-                    st.session_state.editing_complete = False
+        
+        # Changes that would throw away parsed (or edited) entries need an explicit apply
+        if chunking_settings_changed():
+            if st.session_state.chunks:
+                if st.session_state.edited_chunks:
+                    st.warning("Applying this change discards your parsed entries and AI edits.")
+                else:
+                    st.warning("Applying this change discards your parsed entries.")
+                st.button(
+                    "Apply chunking change",
+                    on_click=apply_chunking_settings,
+                    disabled=st.session_state.processing,
+                    use_container_width=True
+                )
+            else:
+                apply_chunking_settings()
         
         st.divider()
         
         # System Prompt Editor
         st.subheader("✏️ AI Editing Instructions")
         
-        system_prompt = st.text_area(
-            "System Prompt",
-            value=st.session_state.system_prompt,
-            height=200,
+        # Edits are held in the form and only applied on submit, so typing doesn't rerun the app
+        with st.form("prompt_form"):
+            st.text_area(
+                "System Prompt",
+                key="system_prompt",
+                height=200,
+                disabled=st.session_state.processing,
+                help="Customize the AI editing instructions. The default prompt focuses on stylistic enhancement while preserving structure.",
+                placeholder="Enter your custom editing instructions here..."
+            )
+            
+            col_apply, col_reset = st.columns(2)
+            with col_apply:
+                st.form_submit_button(
+                    "💾 Apply",
+                    disabled=st.session_state.processing,
+                    use_container_width=True,
+                    help="Save your edited instructions"
+                )
+            with col_reset:
+                # Show reset button to restore default
+                st.form_submit_button(
+                    "🔄 Reset to Default",
+                    on_click=reset_system_prompt,
+                    disabled=st.session_state.processing,
+                    use_container_width=True,
+                    help="Restore the default editing instructions"
+                )
+        
+        # Editing mode selection
+        st.radio(
+            "Mode",
+            options=["Realtime", "Batch (50% cost)"],
+            key="editing_mode",
             disabled=st.session_state.processing,
-            help="Customize the AI editing instructions. The default prompt focuses on stylistic enhancement while preserving structure.",
-            placeholder="Enter your custom editing instructions here..."
+            help="Batch mode uses the OpenAI Batch API: half the cost and higher rate limits, but results can take up to 24 hours"
         )
         
-        # Update session state if prompt was modified
-        if system_prompt != st.session_state.system_prompt:
-            st.session_state.system_prompt = system_prompt
-        
-        # Show reset button to restore default
-        if st.button("🔄 Reset to Default", disabled=st.session_state.processing, help="Restore the default editing instructions"):
-            st.session_state.system_prompt = load_system_prompt()
-            st.rerun()
+        # Rate limits for the OpenAI account
+        with st.expander("🚦 Rate Limits", expanded=False):
+            st.number_input(
+                "Max requests per minute",
+                min_value=1,
+                key="max_requests_per_minute",
+                disabled=st.session_state.processing,
+                help="Requests are throttled to stay under your account's RPM limit"
+            )
+            st.number_input(
+                "Max tokens per minute",
+                min_value=1000,
+                step=1000,
+                key="max_tokens_per_minute",
+                disabled=st.session_state.processing,
+                help="Requests are throttled to stay under your account's TPM limit"
+            )
+            st.number_input(
+                "Max attempts per entry",
+                min_value=1,
+                max_value=10,
+                key="max_attempts",
+                disabled=st.session_state.processing,
+                help="Failed requests are retried with exponential backoff up to this many times"
+            )
+            st.number_input(
+                "Entries per request",
+                min_value=1,
+                max_value=10,
+                key="pack_size",
+                disabled=st.session_state.processing,
+                help="Pack several entries into one request to save requests and repeated prompt tokens. Set to 1 to edit each entry separately"
+            )
         
         st.divider()
         
@@ -141,8 +374,26 @@ def main():
             use_container_width=True
         )
         
+        # Batch job controls replace the editing buttons until its results are collected
+        batch_pending = bool(st.session_state.batch_id)
+        if batch_pending:
+            st.divider()
+            st.button(
+                "🔄 Check batch status",
+                disabled=st.session_state.processing,
+                use_container_width=True,
+                help="Results are collected automatically once the batch has finished"
+            )
+            st.button(
+                "✖ Cancel batch",
+                on_click=cancel_pending_batch,
+                disabled=st.session_state.processing,
+                use_container_width=True,
+                help="Cancel the batch job; entries it has not edited yet are not charged"
+            )
+        
         # AI Editing button (only show if we have chunks)
-        if st.session_state.chunks and not st.session_state.editing_complete:
+        if st.session_state.chunks and not st.session_state.editing_complete and not batch_pending:
             st.divider()
             edit_with_ai = st.button(
                 "✨ Edit with AI",
@@ -155,7 +406,8 @@ def main():
             edit_with_ai = False
         
         # Retry AI editing button (if editing failed)
-        if st.session_state.chunks and st.session_state.edited_chunks and not st.session_state.editing_complete:
+        if (st.session_state.chunks and st.session_state.edited_chunks
+                and not st.session_state.editing_complete and not batch_pending):
             retry_editing = st.button(
                 "🔄 Retry AI Editing",
                 type="secondary",
@@ -171,15 +423,22 @@ def main():
             st.divider()
             
             # Show PDF statistics
-            pdf_stats = get_pdf_stats(st.session_state.edited_chunks)
             st.markdown("**📄 PDF Preview:**")
             st.markdown(f"• {pdf_stats['entries']} entries")
             st.markdown(f"• {pdf_stats['words']} words")
-            st.markdown(f"• ~{pdf_stats['estimated_pages']} pages")
+            pages_placeholder = st.empty()
+            pages_placeholder.markdown(f"• ~{pdf_stats['estimated_pages']} pages")
             
             # Generate PDF and download button
             try:
-                pdf_bytes = create_pdf_bytes(st.session_state.edited_chunks, "Enhanced Journal")
+                if st.session_state.pdf_future is not None:
+                    # Started in the background when editing finished; usually already done
+                    with st.spinner("Generating PDF..."):
+                        pdf_bytes, pdf_pages = st.session_state.pdf_future.result()
+                else:
+                    pdf_bytes, pdf_pages = cached_pdf(st.session_state.edited_chunks, "Enhanced Journal")
+                pages_placeholder.markdown(f"• {pdf_pages} pages")
+                from pdf_generator import get_pdf_filename
                 filename = get_pdf_filename(st.session_state.edited_chunks)
                 
                 st.download_button(
@@ -193,6 +452,8 @@ def main():
                 )
                 
             except Exception as e:
+                # Drop the failed background build so the next rerun retries it
+                st.session_state.pdf_future = None
                 st.error("❌ PDF generation failed")
                 st.error(f"**Error details:** {str(e)}")
                 st.error("**Possible solutions:**")
@@ -212,7 +473,10 @@ def main():
         
         if not st.session_state.processing:
             with status_placeholder.container():
-                if not api_key:
+                if st.session_state.batch_id:
+                    st.info(f"📦 Batch {st.session_state.batch_id} submitted — results can take up to 24h. "
+                            f"{st.session_state.batch_status}")
+                elif not api_key:
                     st.info("👈 Please enter your OpenAI API key in the sidebar to get started")
                 elif not uploaded_file:
                     st.info("👈 Please upload a document (PDF or DOCX) to begin processing")
@@ -231,16 +495,16 @@ def main():
                 st.success("🎉 Your enhanced journal manuscript is ready!")
                 
                 # Show some completion stats
-                editing_stats = get_editing_stats(st.session_state.edited_chunks)
-                pdf_stats = get_pdf_stats(st.session_state.edited_chunks)
-                
                 col_a, col_b, col_c = st.columns(3)
                 with col_a:
                     st.metric("Entries Enhanced", f"{editing_stats['successful']}/{editing_stats['total']}")
                 with col_b:
                     st.metric("Total Words", pdf_stats['words'])
                 with col_c:
-                    st.metric("Estimated Pages", pdf_stats['estimated_pages'])
+                    if pdf_pages is not None:
+                        st.metric("Pages", pdf_pages)
+                    else:
+                        st.metric("Estimated Pages", pdf_stats['estimated_pages'])
                 
                 st.markdown("---")
                 st.markdown("**✨ Your writing has been enhanced with:**")
@@ -268,7 +532,6 @@ def main():
                     
                     # Show editing status if applicable
                     if st.session_state.editing_complete and st.session_state.edited_chunks:
-                        editing_stats = get_editing_stats(st.session_state.edited_chunks)
                         st.success(f"🎨 AI Editing Complete: {editing_stats['successful']}/{editing_stats['total']} entries enhanced")
                     
                     # Show chunk details
@@ -281,14 +544,14 @@ def main():
                         expander_title = "View Chunks"
                         chunk_label = "Chunk"
                     
-                    with st.expander(expander_title, expanded=False):
+                    # Entries are only rendered while the toggle is on, so hidden lists cost nothing
+                    if st.toggle(expander_title, key="show_entries"):
                         for chunk in chunks_to_show:
                             chunk_num = chunk['day']  # Actually chunk number for paragraph method
                             is_edited = chunk.get('edited', False) if st.session_state.editing_complete else False
                             
                             st.markdown(f"**{chunk_label} {chunk_num}** {'✨ (AI Enhanced)' if is_edited else ''}")
-                            preview = chunk['text'][:200] + "..." if len(chunk['text']) > 200 else chunk['text']
-                            st.text(preview)
+                            st.text(chunk['preview'])
                             st.divider()
                 else:
                     st.markdown("""
@@ -305,6 +568,8 @@ def main():
     
     # Handle processing
     if begin_processing:
+        # Reprocessing replaces the chunks anyway, so pending chunking changes apply now
+        apply_chunking_settings()
         st.session_state.processing = True
         
         with status_placeholder.container():
@@ -319,8 +584,9 @@ def main():
                 st.status("📄 Extracting text from document...", expanded=True)
             progress_bar.progress(20, text="📄 Extracting text from document...")
             
-            file_bytes = uploaded_file.read()
-            extracted_text, success, file_type = extract_document_text(file_bytes, uploaded_file.name)
+            # Hand the upload to the extractor as a stream instead of copying it into bytes
+            uploaded_file.seek(0)
+            extracted_text, success, file_type = cached_extract_document_text(uploaded_file, uploaded_file.name)
             
             if not success:
                 with status_placeholder.container():
@@ -345,11 +611,12 @@ def main():
                     st.status("🔍 Splitting into paragraph chunks...", expanded=True)
                     progress_bar.progress(50, text="🔍 Splitting into paragraph chunks...")
             
-            chunks = chunk_document_text(
-                extracted_text, 
-                method=st.session_state.chunking_method,
-                paragraphs_per_chunk=st.session_state.paragraphs_per_chunk
+            chunks = cached_chunk_document_text(
+                extracted_text,
+                st.session_state.chunking_method,
+                st.session_state.paragraphs_per_chunk
             )
+            add_previews(chunks)
             st.session_state.chunks = chunks
             
             chunk_count = get_chunk_count(chunks)
@@ -410,6 +677,9 @@ def main():
     
     # Handle AI editing (both initial and retry)
     if edit_with_ai or retry_editing:
+        # Imported here so sessions that never edit don't pay for the OpenAI SDK and ReportLab
+        from openai_editor import process_chunks_in_batches, submit_batch
+        
         st.session_state.processing = True
         
         with status_placeholder.container():
@@ -419,39 +689,60 @@ def main():
             progress_bar = st.progress(0, text="Initializing AI editing...")
         
         try:
+            last_progress_update = [0.0]
+            
             # Define progress callback with enhanced status messages
             def update_progress(message):
-                # Enhanced status messages as specified in project plan: "Sending batch 3/10 …"
+                # Extract completion counts for progress calculation
+                match = PROGRESS_RE.search(message)
+                if match:
+                    completed, total = map(int, match.groups())
+                    
+                    # Per-entry updates can arrive in bursts; redraw at most every
+                    # PROGRESS_UPDATE_INTERVAL seconds but always show the final count
+                    now = time.monotonic()
+                    if completed < total and now - last_progress_update[0] < PROGRESS_UPDATE_INTERVAL:
+                        return
+                    last_progress_update[0] = now
+                
+                # Enhanced status messages: "Edited 3/10 entries …" as each entry completes
                 with status_placeholder.container():
                     st.status(message, expanded=False)
                 
-                if "batch" in message.lower():
-                    # Extract batch info for progress calculation
-                    if "batch " in message:
-                        try:
-                            parts = message.split("batch ")[1].split("/")
-                            current_batch = int(parts[0])
-                            total_batches = int(parts[1].split("...")[0])
-                            progress_percent = int((current_batch / total_batches) * 80) + 10  # 10-90% range
-                            progress_bar.progress(progress_percent, text=message)
-                        except:
-                            progress_bar.progress(50, text=message)
-                    else:
-                        progress_bar.progress(50, text=message)
+                if match:
+                    progress_percent = int((completed / max(total, 1)) * 80) + 10  # 10-90% range
+                    progress_bar.progress(progress_percent, text=message)
+                else:
+                    progress_bar.progress(10, text=message)
             
             # Process chunks with AI editing
             with status_placeholder.container():
                 st.status("🤖 Connecting to OpenAI...", expanded=True)
             progress_bar.progress(10, text="🤖 Connecting to OpenAI...")
             
+            if st.session_state.editing_mode != "Realtime":
+                # Batch mode only submits the job. Its id is stored straight away so no rerun
+                # can lose the paid batch; results are collected on later reruns
+                update_progress("📦 Submitting batch job to OpenAI …")
+                batch_id = submit_batch(
+                    st.session_state.chunks,
+                    system_prompt=st.session_state.system_prompt
+                )
+                st.session_state.batch_id = batch_id
+                st.session_state.batch_chunks = st.session_state.chunks
+                st.session_state.batch_status = "Waiting for the batch to start …"
+                return  # finally still resets processing and reruns
+            
             edited_chunks = process_chunks_in_batches(
                 st.session_state.chunks,
                 system_prompt=st.session_state.system_prompt,
-                progress_callback=update_progress
+                progress_callback=update_progress,
+                max_requests_per_minute=st.session_state.max_requests_per_minute,
+                max_tokens_per_minute=st.session_state.max_tokens_per_minute,
+                max_attempts=st.session_state.max_attempts,
+                pack_size=st.session_state.pack_size
             )
-            
-            st.session_state.edited_chunks = edited_chunks
-            st.session_state.editing_complete = True
+            complete_editing(edited_chunks)
             
             # Enhanced completion status as specified: "Done — generating PDF"
             with status_placeholder.container():
@@ -5,11 +5,24 @@ Returns List[dict] objects for each day entry.
 """
 
 import re
-from typing import List, Dict
+from itertools import groupby, islice
+from typing import List, Dict, Iterator
 
 
-# Improved regex pattern as specified in project plan
-DAY_RE = re.compile(r'^\s*Day\s+(\d+)\b.*', re.I)
+# Improved regex pattern as specified in project plan.
+# Multiline so a single finditer pass over the whole text finds every header line;
+# whitespace around "Day" (including no-break spaces) may not cross a line break.
+# Flags are inline and classes explicit so RE2 and re match exactly the same text.
+# Group 1 is the header from "Day" on (after any indentation); group 2 is the day number.
+DAY_PATTERN = r'(?im)^[ \t\x0b\x0c\r\xa0]*(Day[ \t\x0b\x0c\r\xa0]+([0-9]+)\b.*)'
+
+try:
+    # Optional: google-re2 matches in linear time, without backtracking
+    import re2
+    DAY_RE = re2.compile(DAY_PATTERN)
+except ImportError:
+    # re.ASCII gives \b the same ASCII word boundaries as RE2
+    DAY_RE = re.compile(DAY_PATTERN, re.ASCII)
 
 
 def parse_journal_entries(text: str) -> List[Dict]:
@@ -23,45 +36,32 @@ def parse_journal_entries(text: str) -> List[Dict]:
     Returns:
         List[Dict]: List of dictionaries with {"day": int, "text": str} format
     """
+    # Record only (day, offset) pairs for each "Day X" header; an end-of-text
+    # sentinel lets each entry (full_entry_with_header) run up to the next header
+    spans = [(int(match.group(2)), match.start(1)) for match in DAY_RE.finditer(text)]
+    spans.append((None, len(text)))
     
-    entries = []
-    current_day = None
-    current_content = []
-    
-    lines = text.split('\n')
+    # Entries start at "Day" itself, so each one is non-empty and
+    # only needs trailing whitespace removed from its single slice
+    return [
+        {"day": day, "text": text[start:end].rstrip()}
+        for (day, start), (_, end) in zip(spans, spans[1:])
+    ]
+
+
+def iter_paragraphs(text: str) -> Iterator[str]:
+    """
+    Lazily split text into paragraphs separated by blank lines.
     
-    for line in lines:
-        # Check if this line matches the improved "Day X" pattern
-        match = DAY_RE.match(line)
+    Args:
+        text (str): The full document text
         
-        if match:
-            # If we were already processing a day, save it
-            if current_day is not None:
-                entry_text = '\n'.join(current_content).strip()
-                if entry_text:  # Only add non-empty entries
-                    entries.append({
-                        "day": current_day,
-                        "text": entry_text
-                    })
-            
-            # Start processing the new day
-            current_day = int(match.group(1))
-            current_content = [line]  # Include the "Day X" line (full_entry_with_header)
-        else:
-            # Add this line to the current day's content
-            if current_day is not None:
-                current_content.append(line)
-    
-    # Don't forget the last entry
-    if current_day is not None:
-        entry_text = '\n'.join(current_content).strip()
-        if entry_text:  # Only add non-empty entries
-            entries.append({
-                "day": current_day,
-                "text": entry_text
-            })
-    
-    return entries
+    Yields:
+        str: Each paragraph, with its stripped lines joined by single spaces
+    """
+    # groupby coalesces runs of non-empty stripped lines
+    lines = (line.strip() for line in text.split('\n'))
+    return (' '.join(group) for non_empty, group in groupby(lines, key=bool) if non_empty)
 
 
 def chunk_by_paragraphs(text: str, paragraphs_per_chunk: int = 3) -> List[Dict]:
@@ -79,41 +79,19 @@ def chunk_by_paragraphs(text: str, paragraphs_per_chunk: int = 3) -> List[Dict]:
     if not text.strip():
         return []
     
-    # Split text into paragraphs (separated by blank lines)
-    paragraphs = []
-    current_paragraph = []
-    
-    lines = text.split('\n')
-    
-    for line in lines:
-        line = line.strip()
-        if line:  # Non-empty line
-            current_paragraph.append(line)
-        else:  # Empty line - end current paragraph
-            if current_paragraph:
-                paragraph_text = ' '.join(current_paragraph)
-                paragraphs.append(paragraph_text)
-                current_paragraph = []
-    
-    # Add final paragraph if exists
-    if current_paragraph:
-        paragraph_text = ' '.join(current_paragraph)
-        paragraphs.append(paragraph_text)
-    
-    # Group paragraphs into chunks
-    chunks = []
-    chunk_number = 1
-    
-    for i in range(0, len(paragraphs), paragraphs_per_chunk):
-        chunk_paragraphs = paragraphs[i:i + paragraphs_per_chunk]
-        chunk_text = '\n\n'.join(chunk_paragraphs)
-        
-        if chunk_text.strip():
-            chunks.append({
-                "day": chunk_number,  # Using "day" for consistency with existing code
-                "text": chunk_text
-            })
-            chunk_number += 1
+    # Group paragraphs into chunks as they are produced, without building a
+    # list of every paragraph: take groups until islice comes back empty
+    paragraphs = iter_paragraphs(text)
+    groups = iter(lambda: list(islice(paragraphs, paragraphs_per_chunk)), [])
+    
+    # Using "day" for consistency with existing code (it is actually the chunk number)
+    chunks = [
+        {
+            "day": chunk_number,
+            "text": '\n\n'.join(group)
+        }
+        for chunk_number, group in enumerate(groups, start=1)
+    ]
     
     return chunks
 
@@ -8,6 +8,7 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from docx import Document
 from docx.shared import Inches
+from chunking_engine import DAY_RE
 import os
 
 
@@ -21,17 +22,20 @@ def create_test_pdf(text_content: str, output_path: str):
     paragraphs = text_content.split('\n\n')
     
     for para in paragraphs:
-        if para.strip():
-            # Check if it's a day header
-            if para.strip().startswith('Day '):
-                # Use heading style for day headers
-                p = Paragraph(para.strip(), styles['Heading2'])
-            else:
-                # Use normal style for content
-                p = Paragraph(para.strip(), styles['Normal'])
-            
-            story.append(p)
-            story.append(Spacer(1, 12))  # Add some space
+        para = para.strip()
+        if not para:
+            continue
+        
+        # Check if it's a day header, using the parser's own pattern
+        if DAY_RE.match(para):
+            # Use heading style for day headers
+            p = Paragraph(para, styles['Heading2'])
+        else:
+            # Use normal style for content
+            p = Paragraph(para, styles['Normal'])
+        
+        story.append(p)
+        story.append(Spacer(1, 12))  # Add some space
     
     doc.build(story)
     print(f"Created test PDF: {output_path}")
@@ -45,14 +49,17 @@ def create_test_docx(text_content: str, output_path: str):
     paragraphs = text_content.split('\n\n')
     
     for para in paragraphs:
-        if para.strip():
-            # Check if it's a day header
-            if para.strip().startswith('Day '):
-                # Add as heading
-                doc.add_heading(para.strip(), level=2)
-            else:
-                # Add as normal paragraph
-                doc.add_paragraph(para.strip())
+        para = para.strip()
+        if not para:
+            continue
+        
+        # Check if it's a day header, using the parser's own pattern
+        if DAY_RE.match(para):
+            # Add as heading
+            doc.add_heading(para, level=2)
+        else:
+            # Add as normal paragraph
+            doc.add_paragraph(para)
     
     doc.save(output_path)
     print(f"Created test DOCX: {output_path}")
@@ -3,10 +3,36 @@ Document Ingestion Module
 Extracts text from PDF and DOCX files while preserving line breaks.
 """
 
-import PyPDF2
-from docx import Document
-from typing import Tuple, Optional
+import pypdfium2 as pdfium
+from lxml import etree
+from typing import Tuple, Optional, Union, BinaryIO, Iterator
 import io
+import threading
+import zipfile
+
+
+# Document content: raw bytes or a binary file-like object (e.g. an uploaded file)
+DocumentSource = Union[bytes, BinaryIO]
+
+# PDFium is not thread-safe, and Streamlit serves each session from its own thread
+_PDFIUM_LOCK = threading.Lock()
+
+# WordprocessingML tags read directly from word/document.xml
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_BODY = WORD_NS + 'body'
+DOCX_PARAGRAPH = WORD_NS + 'p'
+DOCX_RUN = WORD_NS + 'r'
+DOCX_HYPERLINK = WORD_NS + 'hyperlink'
+DOCX_TEXT = WORD_NS + 't'
+DOCX_BREAK = WORD_NS + 'br'
+
+# Text equivalents of the other run content elements (as python-docx renders them)
+DOCX_RUN_CHARACTERS = {
+    WORD_NS + 'tab': '\t',
+    WORD_NS + 'ptab': '\t',
+    WORD_NS + 'cr': '\n',
+    WORD_NS + 'noBreakHyphen': '-'
+}
 
 
 def detect_file_type(filename: str) -> str:
@@ -28,36 +54,65 @@ def detect_file_type(filename: str) -> str:
         return 'unknown'
 
 
-def extract_text_from_pdf(file_bytes: bytes) -> Tuple[str, bool]:
+def as_stream(source: DocumentSource) -> BinaryIO:
     """
-    Extract text from PDF file bytes, preserving line breaks.
+    Return a binary stream for the document content without copying streams.
     
     Args:
-        file_bytes (bytes): PDF file content as bytes
+        source (DocumentSource): File content as bytes or a binary file-like object
         
     Returns:
-        Tuple[str, bool]: (extracted_text, success_flag)
+        BinaryIO: Readable, seekable binary stream
     """
-    try:
-        # Create a BytesIO object from the bytes
-        pdf_file = io.BytesIO(file_bytes)
-        
-        # Create PDF reader
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def iter_pdf_page_texts(pdf: pdfium.PdfDocument) -> Iterator[str]:
+    """
+    Yield the text of each page, releasing PDFium page resources as it goes.
+    
+    Args:
+        pdf (pdfium.PdfDocument): Open PDF document
         
-        # Extract text from all pages
-        text_content = []
+    Yields:
+        str: Page text with PDFium's CRLF line endings normalized to LF
+    """
+    for page in pdf:
+        textpage = page.get_textpage()
+        try:
+            yield textpage.get_text_range().replace('\r\n', '\n')
+        finally:
+            textpage.close()
+            page.close()
+
+
+def extract_text_from_pdf(file_bytes: DocumentSource) -> Tuple[str, bool]:
+    """
+    Extract text from PDF file content, preserving line breaks.
+    Uses PDFium (C++) for text extraction.
+    
+    Args:
+        file_bytes (DocumentSource): PDF file content as bytes or a binary stream
         
-        for page_num in range(len(pdf_reader.pages)):
-            page = pdf_reader.pages[page_num]
-            page_text = page.extract_text()
+    Returns:
+        Tuple[str, bool]: (extracted_text, success_flag)
+    """
+    try:
+        with _PDFIUM_LOCK:
+            # PDFium loads bytes in place and reads streams through callbacks;
+            # only other buffer types need a stream wrapper
+            pdf = pdfium.PdfDocument(file_bytes if isinstance(file_bytes, bytes) else as_stream(file_bytes))
             
-            # Add page text, preserving line breaks
-            if page_text.strip():
-                text_content.append(page_text)
-        
-        # Join pages with double line breaks
-        full_text = '\n\n'.join(text_content)
+            try:
+                # Extract text from all pages, skipping empty ones;
+                # join pages with double line breaks, preserving line breaks
+                full_text = '\n\n'.join(
+                    text for text in iter_pdf_page_texts(pdf) if text.strip()
+                )
+            finally:
+                pdf.close()
         
         return full_text, True
         
@@ -66,31 +121,64 @@ def extract_text_from_pdf(file_bytes: bytes) -> Tuple[str, bool]:
         return "", False
 
 
-def extract_text_from_docx(file_bytes: bytes) -> Tuple[str, bool]:
+def docx_paragraph_text(paragraph: etree._Element) -> str:
     """
-    Extract text from DOCX file bytes, preserving line breaks.
+    Get the text of a <w:p> element from its runs, including runs inside hyperlinks.
     
     Args:
-        file_bytes (bytes): DOCX file content as bytes
+        paragraph (etree._Element): Paragraph element
+        
+    Returns:
+        str: Paragraph text with tabs and line breaks as characters
+    """
+    parts = []
+    for child in paragraph.iterchildren(DOCX_RUN, DOCX_HYPERLINK):
+        runs = child.iterchildren(DOCX_RUN) if child.tag == DOCX_HYPERLINK else (child,)
+        for run in runs:
+            for element in run:
+                if element.tag == DOCX_TEXT:
+                    parts.append(element.text or '')
+                elif element.tag == DOCX_BREAK:
+                    # Line breaks become newlines; page and column breaks add nothing
+                    if element.get(WORD_NS + 'type', 'textWrapping') == 'textWrapping':
+                        parts.append('\n')
+                else:
+                    parts.append(DOCX_RUN_CHARACTERS.get(element.tag, ''))
+    return ''.join(parts)
+
+
+def extract_text_from_docx(file_bytes: DocumentSource) -> Tuple[str, bool]:
+    """
+    Extract text from DOCX file content, preserving line breaks.
+    Streams word/document.xml out of the archive through lxml's parser.
+    
+    Args:
+        file_bytes (DocumentSource): DOCX file content as bytes or a binary stream
         
     Returns:
         Tuple[str, bool]: (extracted_text, success_flag)
     """
     try:
-        # Create a BytesIO object from the bytes
-        docx_file = io.BytesIO(file_bytes)
-        
-        # Create Document object
-        doc = Document(docx_file)
-        
-        # Extract text from all paragraphs
-        text_content = []
-        
-        for paragraph in doc.paragraphs:
-            # Add paragraph text, preserving original line structure
-            para_text = paragraph.text
-            if para_text.strip():  # Only add non-empty paragraphs
-                text_content.append(para_text)
+        # Read straight from the stream; bytes are wrapped without an extra copy
+        with zipfile.ZipFile(as_stream(file_bytes)) as docx_zip:
+            with docx_zip.open('word/document.xml') as document_xml:
+                text_content = []
+                
+                for _, paragraph in etree.iterparse(document_xml, events=('end',), tag=DOCX_PARAGRAPH,
+                                                    resolve_entities=False, no_network=True):
+                    # Only top-level body paragraphs; table cells and text boxes are skipped
+                    if paragraph.getparent().tag != DOCX_BODY:
+                        continue
+                    
+                    # Add paragraph text, preserving original line structure
+                    para_text = docx_paragraph_text(paragraph)
+                    if para_text.strip():  # Only add non-empty paragraphs
+                        text_content.append(para_text)
+                    
+                    # Free the parsed paragraph and everything before it
+                    paragraph.clear()
+                    while paragraph.getprevious() is not None:
+                        del paragraph.getparent()[0]
         
         # Join paragraphs with single line breaks to preserve structure
         full_text = '\n'.join(text_content)
@@ -102,12 +190,12 @@ def extract_text_from_docx(file_bytes: bytes) -> Tuple[str, bool]:
         return "", False
 
 
-def extract_document_text(file_bytes: bytes, filename: str) -> Tuple[str, bool, str]:
+def extract_document_text(file_bytes: DocumentSource, filename: str) -> Tuple[str, bool, str]:
     """
     Extract text from document based on file type.
     
     Args:
-        file_bytes (bytes): File content as bytes
+        file_bytes (DocumentSource): File content as bytes or a binary stream
         filename (str): Name of the file
         
     Returns:
@@ -137,9 +225,10 @@ def extract_document_from_path(file_path: str) -> Tuple[str, bool, str]:
         Tuple[str, bool, str]: (extracted_text, success_flag, file_type)
     """
     try:
+        # Hand the open file to the extractors, which seek and read only what
+        # they need, instead of reading the whole file into a bytes copy
         with open(file_path, 'rb') as file:
-            file_bytes = file.read()
-            return extract_document_text(file_bytes, file_path)
+            return extract_document_text(file, file_path)
     except Exception as e:
         print(f"Error reading file {file_path}: {str(e)}")
         return "", False, "unknown" 
\ No newline at end of file
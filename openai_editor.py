@@ -4,50 +4,55 @@ Batched editing via OpenAI API using gpt-4.5-preview model.
 Reads system prompt from docs/openai-api.md at runtime.
 """
 
+from __future__ import annotations
+
 import os
 import time
+import io
 import json
-from typing import List, Dict, Tuple
-from openai import OpenAI
+import asyncio
+import random
+import re
+import hashlib
+import shelve
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Optional, TYPE_CHECKING
 import streamlit as st
 
+if TYPE_CHECKING:
+    # The openai package is slow to import; it is loaded when a client is first created
+    from openai import OpenAI, AsyncOpenAI
 
-def load_system_prompt() -> str:
-    """
-    Load system prompt from docs/openai-api.md at runtime.
+try:
+    # Optional: orjson (Rust) encodes and decodes JSON several times faster than json
+    import orjson
     
-    Returns:
-        str: System prompt text
-    """
-    try:
-        with open('docs/openai-api.md', 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Extract the system prompt from the content field
-        # Looking for the text content in the system message
-        lines = content.split('\n')
-        in_system_content = False
-        system_prompt_lines = []
-        
-        for line in lines:
-            if '"text":' in line and 'You are a stylistic editor' in line:
-                # Extract the text content between quotes
-                start_quote = line.find('"You are a stylistic editor')
-                if start_quote != -1:
-                    # Find the end of this text block
-                    text_content = line[start_quote+1:]  # Remove first quote
-                    # Remove trailing quote and comma if present
-                    if text_content.endswith('",'):
-                        text_content = text_content[:-2]
-                    elif text_content.endswith('"'):
-                        text_content = text_content[:-1]
-                    
-                    # Replace escaped newlines with actual newlines
-                    text_content = text_content.replace('\\n', '\n')
-                    return text_content
-        
-        # Fallback: extract from the full content if parsing fails
-        return """You are a stylistic editor focused on rhythm and tone, and the creation of polished work worthy of a reader's interest and time.  
+    def json_dumps(obj) -> str:
+        """Serialize obj to a compact JSON string, leaving non-ASCII text unescaped."""
+        return orjson.dumps(obj).decode('utf-8')
+    
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj) -> str:
+        """Serialize obj to a compact JSON string, leaving non-ASCII text unescaped."""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+    
+    json_loads = json.loads
+
+# Source of the default system prompt
+SYSTEM_PROMPT_PATH = 'docs/openai-api.md'
+
+# The prompt is the "text" value (a JSON string) starting "You are a stylistic editor"
+SYSTEM_PROMPT_PREFIX = 'You are a stylistic editor'
+SYSTEM_PROMPT_RE = re.compile(r'"text"\s*:\s*"(You are a stylistic editor.*?)(?<!\\)"', re.S)
+
+# The request payload in the prompt file: everything from the first "{" to the last "}"
+SYSTEM_PROMPT_JSON_RE = re.compile(r'\{.*\}', re.S)
+
+# Used when the prompt file exists but the prompt can't be found in it
+FALLBACK_SYSTEM_PROMPT = """You are a stylistic editor focused on rhythm and tone, and the creation of polished work worthy of a reader's interest and time.  
 TASK: Enhance narrative energy without altering structure.
 
 Rules
@@ -59,15 +64,134 @@ Rules
 4. Preserve the author's point of view, tense, and factual statements but using a prose style and grammatical pattern of the best modern writers.
 5. Journal-day headers stay intact except for mechanical fixes.
 6. Return EDITED TEXT only—no editor notes or tags."""
+
+# Number of chunks edited concurrently (override with EDITOR_CONCURRENCY)
+DEFAULT_CONCURRENCY = 10
+
+# Client-side rate limits, kept below the account ceiling to avoid 429s
+DEFAULT_MAX_REQUESTS_PER_MINUTE = 500
+DEFAULT_MAX_TOKENS_PER_MINUTE = 125000
+DEFAULT_MAX_ATTEMPTS = 4
+
+# Number of chunks packed into a single request
+DEFAULT_PACK_SIZE = 4
+
+# Appended to packed requests so the reply can be split back into chunks
+PACK_INSTRUCTIONS = (
+    'The user message is a JSON object of the form {"entries": [{"day": <day>, "text": <text>}]}. '
+    "Edit the text of each entry independently, following the instructions above. "
+    'Return a JSON object of the form {"entries": [{"day": <day>, "text": <edited text>}]} '
+    "with exactly one item per input entry, keeping each entry's day value."
+)
+
+# Persistent cache of edited text, keyed on a hash of the system prompt and chunk text
+EDIT_CACHE_PATH = '.edit_cache'
+
+# shelve does not support concurrent access; serialize across threads and sessions
+_EDIT_CACHE_LOCK = threading.Lock()
+
+# Base delay (seconds) for exponential backoff between retries
+RETRY_BASE_DELAY = 1.0
+
+# Batch API job states after which no more progress will be made
+BATCH_TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+def _find_system_prompt(payload) -> Optional[str]:
+    """
+    Walk a parsed request payload for the system prompt's "text" field.
+    
+    Args:
+        payload: Parsed JSON (dicts, lists and scalars)
+        
+    Returns:
+        Optional[str]: System prompt text, or None if there isn't one
+    """
+    if isinstance(payload, dict):
+        text = payload.get("text")
+        if isinstance(text, str) and text.startswith(SYSTEM_PROMPT_PREFIX):
+            return text
+        payload = payload.values()
+    elif not isinstance(payload, list):
+        return None
+    
+    for value in payload:
+        prompt = _find_system_prompt(value)
+        if prompt is not None:
+            return prompt
+    return None
+
+
+@lru_cache(maxsize=1)
+def _parse_system_prompt(mtime: float) -> str:
+    """
+    Read and parse the system prompt file. Cached on the file's modification
+    time, so the file is only re-read after it changes.
+    
+    Args:
+        mtime (float): Modification time of the prompt file (cache key)
+        
+    Returns:
+        str: System prompt text
+    """
+    with open(SYSTEM_PROMPT_PATH, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    # Parse the JSON payload and take the "text" field of the system message
+    match = SYSTEM_PROMPT_JSON_RE.search(content)
+    if match:
+        try:
+            prompt = _find_system_prompt(json_loads(match.group(0)))
+            if prompt is not None:
+                return prompt
+        except json.JSONDecodeError:  # orjson's decode error is a subclass
+            pass
+    
+    # Fallback: scan for the "text" field directly if the payload isn't valid JSON
+    match = SYSTEM_PROMPT_RE.search(content)
+    if match:
+        # Replace escaped newlines with actual newlines
+        return match.group(1).replace('\\n', '\n')
+    
+    # Fallback: use the built-in prompt if parsing fails
+    return FALLBACK_SYSTEM_PROMPT
+
+
+def load_system_prompt() -> str:
+    """
+    Load system prompt from docs/openai-api.md at runtime.
+    
+    Returns:
+        str: System prompt text
+    """
+    try:
+        return _parse_system_prompt(os.path.getmtime(SYSTEM_PROMPT_PATH))
         
     except Exception as e:
         st.error(f"Error loading system prompt: {str(e)}")
         return "You are a helpful assistant that edits text."
 
 
+@lru_cache(maxsize=4)
+def _get_openai_client(api_key: str) -> OpenAI:
+    """
+    Create one OpenAI client per API key and keep it for reuse.
+    
+    Args:
+        api_key (str): OpenAI API key
+        
+    Returns:
+        OpenAI: OpenAI client with its own keep-alive connection pool
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
 def create_openai_client() -> OpenAI:
     """
-    Create OpenAI client using API key from environment.
+    Get the OpenAI client for the API key in the environment.
+    The client is shared between calls (it is thread-safe), so its
+    connections stay warm across documents instead of re-handshaking.
     
     Returns:
         OpenAI: Configured OpenAI client
@@ -76,103 +200,444 @@ def create_openai_client() -> OpenAI:
     if not api_key:
         raise ValueError("OPENAI_API_KEY not found in environment variables")
     
-    return OpenAI(api_key=api_key)
+    return _get_openai_client(api_key)
+
+
+def create_async_openai_client() -> AsyncOpenAI:
+    """
+    Create async OpenAI client using API key from environment.
+    Unlike the sync client this isn't shared: its connections belong to the
+    event loop it was first used on, and each run gets a new loop from asyncio.run.
+    
+    Returns:
+        AsyncOpenAI: Configured async OpenAI client
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=api_key)
 
 
-def edit_single_chunk(client: OpenAI, system_prompt: str, chunk_text: str) -> Tuple[str, bool]:
+def build_completion_params(system_prompt: str, chunk_text: str) -> Dict:
     """
-    Edit a single chunk using OpenAI API.
+    Build the chat completion request parameters for a single chunk.
     
     Args:
-        client (OpenAI): OpenAI client
         system_prompt (str): System prompt for editing
         chunk_text (str): Text to edit
         
     Returns:
-        Tuple[str, bool]: (edited_text, success_flag)
+        Dict: Keyword arguments for chat.completions.create
     """
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4.5-preview",
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user", 
-                    "content": chunk_text
-                }
-            ],
-            temperature=0.43,
-            max_completion_tokens=16384,
-            top_p=1,
-            frequency_penalty=0,
-            presence_penalty=0
-        )
+    return {
+        "model": "gpt-4.5-preview",
+        "messages": [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user", 
+                "content": chunk_text
+            }
+        ],
+        "temperature": 0.43,
+        "max_completion_tokens": 16384,
+        "top_p": 1,
+        "frequency_penalty": 0,
+        "presence_penalty": 0
+    }
+
+
+def edit_cache_key(system_prompt: str, chunk_text: str) -> str:
+    """
+    Build the edit cache key for a chunk edited with a given prompt.
+    
+    Args:
+        system_prompt (str): System prompt for editing
+        chunk_text (str): Text to edit
         
-        edited_text = response.choices[0].message.content
-        return edited_text, True
+    Returns:
+        str: SHA-256 hex digest of the prompt and text
+    """
+    return hashlib.sha256((system_prompt + '\0' + chunk_text).encode('utf-8')).hexdigest()
+
+
+def get_cached_edits(system_prompt: str, chunk_texts: List[str]) -> List[Optional[str]]:
+    """
+    Look up previously edited text for several chunks in one cache read.
+    
+    Args:
+        system_prompt (str): System prompt for editing
+        chunk_texts (List[str]): Texts to look up
         
+    Returns:
+        List[Optional[str]]: Edited text for each chunk, or None on a cache miss
+    """
+    try:
+        with _EDIT_CACHE_LOCK, shelve.open(EDIT_CACHE_PATH) as cache:
+            return [cache.get(edit_cache_key(system_prompt, text)) for text in chunk_texts]
     except Exception as e:
-        print(f"Error editing chunk: {str(e)}")
-        return chunk_text, False  # Return original text on error
+        print(f"Edit cache unavailable: {str(e)}")
+        return [None] * len(chunk_texts)
+
+
+def store_cached_edits(system_prompt: str, edits: Dict[str, str]):
+    """
+    Save edited text for several chunks in one cache write.
+    
+    Args:
+        system_prompt (str): System prompt used for editing
+        edits (Dict[str, str]): Edited text keyed by original chunk text
+    """
+    if not edits:
+        return
+    
+    try:
+        with _EDIT_CACHE_LOCK, shelve.open(EDIT_CACHE_PATH) as cache:
+            for chunk_text, edited_text in edits.items():
+                cache[edit_cache_key(system_prompt, chunk_text)] = edited_text
+    except Exception as e:
+        print(f"Edit cache unavailable: {str(e)}")
+
+
+def clear_cache():
+    """
+    Remove all cached edits, e.g. after changing the model or its settings.
+    """
+    with _EDIT_CACHE_LOCK:
+        # The "n" flag always creates a new, empty cache
+        shelve.open(EDIT_CACHE_PATH, flag='n').close()
+
+
+def estimate_request_tokens(params: Dict) -> int:
+    """
+    Estimate the tokens a request counts against the TPM limit. OpenAI reserves
+    the prompt plus the full max_completion_tokens when the request arrives,
+    however short the reply turns out; the prompt uses ~4 characters per token.
+    
+    Args:
+        params (Dict): Request parameters from build_completion_params or build_packed_params
+    
+    Returns:
+        int: Estimated token count (prompt + completion cap)
+    """
+    prompt_chars = sum(len(message["content"]) for message in params["messages"])
+    return prompt_chars // 4 + 1 + params.get("max_completion_tokens", 0)
+
+
+async def _create_completion(client: AsyncOpenAI, params: Dict) -> str:
+    """
+    Send one prepared edit request with the async client.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI client
+        params (Dict): Request parameters from build_completion_params or build_packed_params
+        
+    Returns:
+        str: Response content (edited text, or JSON for a packed request)
+    """
+    response = await client.chat.completions.create(**params)
+    return response.choices[0].message.content
+
+
+def build_packed_content(pack_chunks: List[Dict]) -> str:
+    """
+    Pack several chunks into a single JSON user message.
+    
+    Args:
+        pack_chunks (List[Dict]): Chunks to pack together
+        
+    Returns:
+        str: JSON object with an "entries" array of {"day", "text"} items
+    """
+    entries = [{"day": chunk["day"], "text": chunk["text"]} for chunk in pack_chunks]
+    return json_dumps({"entries": entries})
 
 
-def edit_batch_with_retry(client: OpenAI, system_prompt: str, batch_chunks: List[Dict], max_retries: int = 3) -> List[Dict]:
+def build_packed_params(system_prompt: str, pack_chunks: List[Dict]) -> Dict:
     """
-    Edit a batch of chunks with exponential backoff retry logic.
+    Build the chat completion request parameters for a pack of chunks.
     
     Args:
-        client (OpenAI): OpenAI client
         system_prompt (str): System prompt for editing
-        batch_chunks (List[Dict]): List of chunks to edit
-        max_retries (int): Maximum number of retries
+        pack_chunks (List[Dict]): Chunks to edit together
         
     Returns:
-        List[Dict]: List of edited chunks with {"day": int, "text": str, "edited": bool}
+        Dict: Keyword arguments for chat.completions.create, requesting a JSON reply
     """
-    edited_chunks = []
+    params = build_completion_params(
+        f"{system_prompt}\n\n{PACK_INSTRUCTIONS}", build_packed_content(pack_chunks)
+    )
+    params["response_format"] = {"type": "json_object"}
+    return params
+
+
+def parse_packed_response(content: str, pack_chunks: List[Dict]) -> Dict[int, str]:
+    """
+    Split a packed JSON response back into edited chunk texts, matching on day.
+    Entries with a day that isn't in the pack, or whose text isn't a string
+    (e.g. null), are ignored, so those chunks count as missing from the reply.
     
-    for chunk in batch_chunks:
-        chunk_text = chunk["text"]
-        day_num = chunk["day"]
+    Args:
+        content (str): JSON response content
+        pack_chunks (List[Dict]): Chunks that were sent in the pack
+        
+    Returns:
+        Dict[int, str]: Edited text keyed by chunk position within the pack
         
-        success = False
-        edited_text = chunk_text
+    Raises:
+        ValueError, KeyError, TypeError: If the response doesn't match the schema
+    """
+    # Queue positions per day so repeated day numbers are matched in order
+    positions = {}
+    for position, chunk in enumerate(pack_chunks):
+        positions.setdefault(chunk["day"], deque()).append(position)
+    
+    edited_texts = {}
+    for item in json_loads(content)["entries"]:
+        text = item["text"]
+        day_positions = positions.get(int(item["day"]))
+        if day_positions:
+            # A non-string text still uses up its position, which stays missing
+            position = day_positions.popleft()
+            if isinstance(text, str):
+                edited_texts[position] = text
+    return edited_texts
+
+
+async def _edit_all_chunks(chunks: List[Dict], system_prompt: str, progress_callback=None,
+                           concurrency: int = DEFAULT_CONCURRENCY,
+                           max_requests_per_minute: float = DEFAULT_MAX_REQUESTS_PER_MINUTE,
+                           max_tokens_per_minute: float = DEFAULT_MAX_TOKENS_PER_MINUTE,
+                           max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                           pack_size: int = DEFAULT_PACK_SIZE) -> List[Dict]:
+    """
+    Edit all chunks in parallel while throttling to the request and token limits.
+    Follows the OpenAI cookbook's parallel processor: request and token capacity
+    replenish continuously, and failed requests wait out an exponential backoff
+    in a retry queue before being dispatched again.
+    
+    Args:
+        chunks (List[Dict]): List of chunks to edit
+        system_prompt (str): System prompt for editing
+        progress_callback: Optional callback function for progress updates
+        concurrency (int): Maximum number of requests in flight
+        max_requests_per_minute (float): Request rate limit
+        max_tokens_per_minute (float): Token rate limit
+        max_attempts (int): Maximum attempts per chunk before giving up
+        pack_size (int): Number of chunks sent per request
         
-        for attempt in range(max_retries + 1):
-            try:
-                edited_text, success = edit_single_chunk(client, system_prompt, chunk_text)
-                if success:
-                    break
-                    
-            except Exception as e:
-                if attempt < max_retries:
-                    # Exponential backoff: 2^attempt seconds
-                    wait_time = 2 ** attempt
-                    print(f"Retry {attempt + 1} for Day {day_num} in {wait_time}s...")
-                    time.sleep(wait_time)
+    Returns:
+        List[Dict]: List of edited chunks, in the same order as the input
+    """
+    total_chunks = len(chunks)
+    results = [None] * total_chunks
+    
+    def make_task(indices: List[int], attempts: int = 0) -> list:
+        # Each task is [chunk_indices, token_estimate, attempts_made, request_params];
+        # the request (including any JSON serialization) is built once and reused on retry
+        if len(indices) == 1:
+            params = build_completion_params(system_prompt, chunks[indices[0]]["text"])
+        else:
+            params = build_packed_params(system_prompt, [chunks[i] for i in indices])
+        tokens = estimate_request_tokens(params)
+        return [indices, min(tokens, max_tokens_per_minute), attempts, params]
+    
+    # Only chunks without a cached edit are sent. Tasks are built lazily, so the
+    # next request is prepared while earlier ones are in flight
+    cached_texts = get_cached_edits(system_prompt, [chunk["text"] for chunk in chunks])
+    uncached = [index for index, text in enumerate(cached_texts) if text is None]
+    pending = (
+        make_task(uncached[i:i + pack_size])
+        for i in range(0, len(uncached), pack_size)
+    )
+    retry_queue = asyncio.Queue()
+    
+    available_request_capacity = max_requests_per_minute
+    available_token_capacity = max_tokens_per_minute
+    last_update_time = time.monotonic()
+    in_flight = 0
+    completed = 0
+    reported = 0
+    background_tasks = set()  # Hold references so running tasks aren't garbage collected
+    task_errors = []  # Exceptions escaping spawned tasks; the dispatcher re-raises them
+    new_edits = {}  # Fresh edits keyed by original text; written to the cache once, after the run
+    
+    def task_done(future: asyncio.Future):
+        background_tasks.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            task_errors.append(future.exception())
+    
+    def spawn(coro):
+        future = asyncio.ensure_future(coro)
+        background_tasks.add(future)
+        future.add_done_callback(task_done)
+    
+    def finish(index: int, text: str, edited: bool):
+        # Only records the result: progress is reported by the dispatcher, so a
+        # raising callback can't strand a request task and stall the loop
+        nonlocal completed
+        results[index] = {
+            "day": chunks[index]["day"],
+            "text": text,
+            "edited": edited
+        }
+        completed += 1
+    
+    def report_progress():
+        nonlocal reported
+        if progress_callback and completed > reported:
+            reported = completed
+            progress_callback(f"Edited {completed}/{total_chunks} entries …")
+    
+    for index, cached_text in enumerate(cached_texts):
+        if cached_text is not None:
+            finish(index, cached_text, True)
+    
+    async def requeue_after_backoff(task: list):
+        # Exponential backoff with jitter so retries don't arrive in lockstep
+        wait_time = RETRY_BASE_DELAY * 2 ** (task[2] - 1) + random.uniform(0, RETRY_BASE_DELAY)
+        await asyncio.sleep(wait_time)
+        retry_queue.put_nowait(task)
+    
+    async def run(client: AsyncOpenAI, task: list):
+        nonlocal in_flight
+        indices, _, attempts, params = task
+        failed = indices
+        error = None
+        schema_mismatch = False
+        try:
+            content = await _create_completion(client, params)
+            if len(indices) == 1:
+                edited_texts = {0: content}
+            else:
+                try:
+                    edited_texts = parse_packed_response(content, [chunks[i] for i in indices])
+                except (ValueError, KeyError, TypeError) as e:
+                    edited_texts = {}
+                    error = f"malformed packed response: {e!r}"
+            
+            # Attribute results by position in the pack; anything missing counts as failed
+            failed = []
+            for position, index in enumerate(indices):
+                if position in edited_texts:
+                    finish(index, edited_texts[position], True)
                 else:
-                    print(f"Failed to edit Day {day_num} after {max_retries} retries")
+                    failed.append(index)
+            new_edits.update(
+                (chunks[indices[position]]["text"], text) for position, text in edited_texts.items()
+            )
+            if failed and len(indices) > 1:
+                schema_mismatch = True
+                error = error or "missing from packed response"
+        except Exception as e:
+            error = str(e)
+        finally:
+            in_flight -= 1
         
-        edited_chunks.append({
-            "day": day_num,
-            "text": edited_text,
-            "edited": success
-        })
+        if failed:
+            days = ", ".join(str(chunks[i]["day"]) for i in failed)
+            if attempts < max_attempts:
+                print(f"Retry {attempts} for Day {days}... ({error})")
+                if schema_mismatch:
+                    # Fall back to one request per chunk rather than repeating the pack
+                    for index in failed:
+                        spawn(requeue_after_backoff(make_task([index], attempts)))
+                else:
+                    spawn(requeue_after_backoff(task))
+            else:
+                print(f"Failed to edit Day {days} after {attempts} attempts: {error}")
+                # Return original text on error
+                for index in failed:
+                    finish(index, chunks[index]["text"], False)
     
-    return edited_chunks
+    if completed == total_chunks:
+        # Every chunk was cached, so no client (or API key) is needed
+        report_progress()
+        return results
+    
+    # One client per run so every request shares the same connection pool
+    async with create_async_openai_client() as client:
+        try:
+            next_task = None
+            while completed < total_chunks:
+                # A failed task would never finish its chunks; stop instead of waiting forever
+                if task_errors:
+                    raise task_errors[0]
+                report_progress()
+                
+                if next_task is None:
+                    if not retry_queue.empty():
+                        next_task = retry_queue.get_nowait()
+                    else:
+                        next_task = next(pending, None)
+                
+                # Replenish capacity based on time elapsed since the last pass
+                now = time.monotonic()
+                elapsed = now - last_update_time
+                last_update_time = now
+                available_request_capacity = min(
+                    available_request_capacity + max_requests_per_minute * elapsed / 60.0,
+                    max_requests_per_minute
+                )
+                available_token_capacity = min(
+                    available_token_capacity + max_tokens_per_minute * elapsed / 60.0,
+                    max_tokens_per_minute
+                )
+                
+                if (next_task is not None
+                        and in_flight < concurrency
+                        and available_request_capacity >= 1
+                        and available_token_capacity >= next_task[1]):
+                    available_request_capacity -= 1
+                    available_token_capacity -= next_task[1]
+                    next_task[2] += 1
+                    in_flight += 1
+                    spawn(run(client, next_task))
+                    next_task = None
+                else:
+                    # Nothing dispatchable right now; yield to in-flight requests
+                    await asyncio.sleep(0.01)
+        finally:
+            # On any error (including a Stop or rerun raised by the progress callback)
+            # cancel requests still in flight or waiting to retry
+            unfinished = list(background_tasks)
+            for future in unfinished:
+                future.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+            
+            # One cache write per run, once no request is in flight; edits already
+            # paid for are kept even when the run is interrupted
+            store_cached_edits(system_prompt, new_edits)
+    
+    report_progress()
+    return results
 
 
-def process_chunks_in_batches(chunks: List[Dict], system_prompt: str = None, progress_callback=None) -> List[Dict]:
+def process_chunks_in_batches(chunks: List[Dict], system_prompt: str = None, progress_callback=None,
+                              concurrency: int = None,
+                              max_requests_per_minute: float = DEFAULT_MAX_REQUESTS_PER_MINUTE,
+                              max_tokens_per_minute: float = DEFAULT_MAX_TOKENS_PER_MINUTE,
+                              max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                              pack_size: int = DEFAULT_PACK_SIZE) -> List[Dict]:
     """
-    Process all chunks in batches of 4 with OpenAI editing.
+    Process all chunks in parallel with OpenAI editing, throttled to stay
+    within the account's request and token rate limits.
     
     Args:
         chunks (List[Dict]): List of chunks to edit
         system_prompt (str): Custom system prompt to use (if None, loads default)
         progress_callback: Optional callback function for progress updates
+        concurrency (int): Maximum number of requests in flight
+                           (if None, reads EDITOR_CONCURRENCY or uses the default)
+        max_requests_per_minute (float): Request rate limit
+        max_tokens_per_minute (float): Token rate limit
+        max_attempts (int): Maximum attempts per chunk before keeping the original text
+        pack_size (int): Number of chunks sent per request; above 1, chunks are
+                         packed into one message and returned as structured JSON
         
     Returns:
         List[Dict]: List of edited chunks
@@ -184,28 +649,136 @@ def process_chunks_in_batches(chunks: List[Dict], system_prompt: str = None, pro
     if system_prompt is None:
         system_prompt = load_system_prompt()
     
-    # Create OpenAI client
+    if concurrency is None:
+        concurrency = int(os.getenv("EDITOR_CONCURRENCY", DEFAULT_CONCURRENCY))
+    
+    if progress_callback:
+        progress_callback(f"Sending {len(chunks)} entries ({concurrency} at a time) …")
+    
+    return asyncio.run(
+        _edit_all_chunks(
+            chunks,
+            system_prompt,
+            progress_callback=progress_callback,
+            concurrency=max(1, concurrency),
+            max_requests_per_minute=max_requests_per_minute,
+            max_tokens_per_minute=max_tokens_per_minute,
+            max_attempts=max(1, max_attempts),
+            pack_size=max(1, pack_size)
+        )
+    )
+
+
+def submit_batch(chunks: List[Dict], system_prompt: str = None) -> str:
+    """
+    Submit all chunks as a single OpenAI Batch API job.
+    Batch jobs cost 50% less and have a separate, higher rate limit,
+    but may take up to 24 hours to complete.
+    
+    Args:
+        chunks (List[Dict]): List of chunks to edit
+        system_prompt (str): Custom system prompt to use (if None, loads default)
+        
+    Returns:
+        str: ID of the created batch
+    """
+    if system_prompt is None:
+        system_prompt = load_system_prompt()
+    
     client = create_openai_client()
     
-    # Process in batches of 4
-    batch_size = 4
-    total_chunks = len(chunks)
-    all_edited_chunks = []
+    # One JSONL request per chunk, built in memory (no disk I/O)
+    lines = [
+        json_dumps({
+            "custom_id": f"chunk-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": build_completion_params(system_prompt, chunk["text"])
+        })
+        for i, chunk in enumerate(chunks)
+    ]
+    batch_file = io.BytesIO("\n".join(lines).encode("utf-8"))
     
-    for i in range(0, total_chunks, batch_size):
-        batch_chunks = chunks[i:i + batch_size]
-        batch_num = (i // batch_size) + 1
-        total_batches = (total_chunks + batch_size - 1) // batch_size
+    input_file = client.files.create(
+        file=("manuscript_batch.jsonl", batch_file),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    return batch.id
+
+
+def check_batch(batch_id: str, chunks: List[Dict], progress_callback=None) -> Optional[List[Dict]]:
+    """
+    Check a Batch API job once, without waiting, and map its results back onto
+    the chunks once it has finished. Chunks without a successful result keep
+    their original text. Callers check again later (e.g. on the next rerun)
+    while the job is still running.
+    
+    Args:
+        batch_id (str): ID returned by submit_batch
+        chunks (List[Dict]): The chunks that were submitted, in submission order
+        progress_callback: Optional callback function for progress updates
         
+    Returns:
+        Optional[List[Dict]]: Edited chunks with {"day": int, "text": str, "edited": bool},
+                              or None while the batch is still running
+    """
+    client = create_openai_client()
+    total_chunks = len(chunks)
+    
+    batch = client.batches.retrieve(batch_id)
+    if batch.status not in BATCH_TERMINAL_STATES:
         if progress_callback:
-            # Enhanced batch status message as specified in project plan: "Sending batch 3/10 …"
-            progress_callback(f"Sending batch {batch_num}/{total_batches} …")
-        
-        # Edit this batch
-        edited_batch = edit_batch_with_retry(client, system_prompt, batch_chunks)
-        all_edited_chunks.extend(edited_batch)
+            counts = batch.request_counts
+            done = (counts.completed + counts.failed) if counts else 0
+            progress_callback(f"Edited {done}/{total_chunks} entries … (batch {batch.status})")
+        return None
+    
+    # Collect edited text from the output file, keyed by custom_id
+    edited_texts = {}
+    if batch.output_file_id:
+        output = client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json_loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                body = response["body"]
+                edited_texts[result["custom_id"]] = body["choices"][0]["message"]["content"]
+            else:
+                print(f"Batch request {result.get('custom_id')} failed: {result.get('error')}")
     
-    return all_edited_chunks
+    if batch.status != "completed":
+        print(f"Batch {batch_id} ended with status '{batch.status}'")
+    
+    edited_chunks = []
+    for i, chunk in enumerate(chunks):
+        edited_text = edited_texts.get(f"chunk-{i}")
+        edited_chunks.append({
+            "day": chunk["day"],
+            "text": edited_text if edited_text is not None else chunk["text"],
+            "edited": edited_text is not None
+        })
+    
+    if progress_callback:
+        progress_callback(f"Edited {len(edited_texts)}/{total_chunks} entries …")
+    
+    return edited_chunks
+
+
+def cancel_batch(batch_id: str):
+    """
+    Cancel a Batch API job whose results are no longer wanted.
+    
+    Args:
+        batch_id (str): ID returned by submit_batch
+    """
+    create_openai_client().batches.cancel(batch_id)
 
 
 def get_editing_stats(edited_chunks: List[Dict]) -> Dict[str, int]:
@@ -4,72 +4,65 @@ Re-assembly & Export functionality using ReportLab.
 Concatenates edited chunks and generates downloadable PDF.
 """
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
-from typing import List, Dict
+from typing import List, Dict, BinaryIO, Tuple, NamedTuple, Any
+from operator import itemgetter
+from functools import lru_cache
 import io
-from datetime import datetime
+import re
+import time
 
 
-def concatenate_chunks(chunks: List[Dict]) -> str:
-    """
-    Concatenate edited chunks with two blank lines between days.
-    
-    Args:
-        chunks (List[Dict]): List of edited chunks with {"day": int, "text": str}
-        
-    Returns:
-        str: Concatenated text with proper spacing
-    """
-    if not chunks:
-        return ""
-    
-    # Sort chunks by day number to ensure proper order
-    sorted_chunks = sorted(chunks, key=lambda x: x["day"])
-    
-    # Concatenate with two blank lines between days
-    full_text_parts = []
-    
-    for chunk in sorted_chunks:
-        chunk_text = chunk["text"].strip()
-        if chunk_text:
-            full_text_parts.append(chunk_text)
-    
-    # Join with two blank lines (two \n\n creates the spacing)
-    full_text = "\n\n\n\n".join(full_text_parts)
-    
-    return full_text
+# ReportLab paragraphs are parsed as markup; escape its special characters in one pass
+ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
 
+# Sort key for chunks (a C-level callable, unlike a lambda)
+BY_DAY = itemgetter("day")
 
-def create_pdf_bytes(chunks: List[Dict], title: str = "Enhanced Journal") -> bytes:
+# Chunk text accessor for map() over chunks
+CHUNK_TEXT = itemgetter("text")
+
+# A chunk's first line starting with this prefix is rendered as its day header
+DAY_PREFIX = "Day "
+
+# Blank lines (possibly containing whitespace) separate paragraphs; the split also
+# consumes the whitespace around them, so paragraphs come out already stripped
+PARAGRAPH_SPLIT_RE = re.compile(r'\s*\n\s*\n\s*')
+
+# A line break and the whitespace around it; paragraph lines are joined with a space
+LINE_BREAK_RE = re.compile(r'\s*\n\s*')
+
+# Format of the "Generated on" date, e.g. "January 02, 2025"
+DATE_FORMAT = "%B %d, %Y"
+
+
+class ReportLab(NamedTuple):
+    """ReportLab symbols and paragraph styles used to build a PDF."""
+    A4: Any
+    inch: float
+    SimpleDocTemplate: Any
+    Paragraph: Any
+    Spacer: Any
+    normal_style: Any
+    title_style: Any
+    day_header_style: Any
+    body_style: Any
+
+
+@lru_cache(maxsize=1)
+def _load_reportlab() -> ReportLab:
     """
-    Create a PDF from edited chunks using ReportLab.
-    Returns in-memory bytes for download (no disk I/O).
+    Import ReportLab and build the paragraph styles on first use, once per process.
+    Keeps ReportLab out of the import cost of callers that only need filenames or stats.
     
-    Args:
-        chunks (List[Dict]): List of edited chunks
-        title (str): Title for the PDF document
-        
     Returns:
-        bytes: PDF content as bytes
+        ReportLab: The needed ReportLab symbols and shared paragraph styles
     """
-    # Create in-memory buffer
-    buffer = io.BytesIO()
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.enums import TA_LEFT, TA_CENTER
     
-    # Create PDF document with A4 portrait format
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        topMargin=1*inch,
-        bottomMargin=1*inch,
-        leftMargin=1*inch,
-        rightMargin=1*inch
-    )
-    
-    # Get sample styles and create custom styles
     styles = getSampleStyleSheet()
     
     # Custom title style
@@ -104,77 +97,203 @@ def create_pdf_bytes(chunks: List[Dict], title: str = "Enhanced Journal") -> byt
         leading=16  # Line spacing
     )
     
-    # Build the story (content for PDF)
-    story = []
+    return ReportLab(
+        A4=A4,
+        inch=inch,
+        SimpleDocTemplate=SimpleDocTemplate,
+        Paragraph=Paragraph,
+        Spacer=Spacer,
+        normal_style=styles['Normal'],
+        title_style=title_style,
+        day_header_style=day_header_style,
+        body_style=body_style
+    )
+
+
+def generation_date() -> str:
+    """
+    Get today's date for the "Generated on" line.
+    
+    Returns:
+        str: Formatted date string
+    """
+    # time.strftime formats the local time in C without building a datetime object
+    return time.strftime(DATE_FORMAT)
+
+
+def _prepare_chunk(chunk: Dict) -> str:
+    """
+    Normalize a chunk once into the form every output path consumes.
+    
+    Args:
+        chunk (Dict): Chunk with {"day": int, "text": str}
+        
+    Returns:
+        str: Stripped text (empty if the chunk is blank)
+    """
+    return chunk["text"].strip()
+
+
+def concatenate_chunks(chunks: List[Dict], already_sorted: bool = False) -> str:
+    """
+    Concatenate edited chunks with two blank lines between days.
+    
+    Args:
+        chunks (List[Dict]): List of edited chunks with {"day": int, "text": str}
+        already_sorted (bool): Skip sorting when the chunks are already in day order
+        
+    Returns:
+        str: Concatenated text with proper spacing
+    """
+    if not chunks:
+        return ""
+    
+    # Sort chunks by day number to ensure proper order
+    sorted_chunks = chunks if already_sorted else sorted(chunks, key=BY_DAY)
+    
+    # Join the non-blank texts with two blank lines (two \n\n creates the spacing)
+    return "\n\n\n\n".join(chunk_text for chunk_text in map(_prepare_chunk, sorted_chunks) if chunk_text)
+
+
+def _build_chunk_fragment(chunk_text: str) -> List:
+    """
+    Build the flowables for one stripped chunk: its day header, then its paragraphs.
+    
+    Args:
+        chunk_text (str): Stripped chunk text
+        
+    Returns:
+        List: Paragraph flowables (empty for a blank chunk)
+    """
+    if not chunk_text:
+        return []
     
-    # Add title
-    story.append(Paragraph(title, title_style))
-    story.append(Spacer(1, 20))
+    # Only the first line can be the day header; "Day" lines further down are body text
+    first_line, _, rest = chunk_text.partition('\n')
+    first_line = first_line.rstrip()
+    if first_line.startswith(DAY_PREFIX):
+        day_header = first_line
+        body = rest.lstrip()
+    else:
+        day_header = None
+        body = chunk_text
     
-    # Add generation date
-    date_str = datetime.now().strftime("%B %d, %Y")
-    date_para = Paragraph(f"Generated on {date_str}", styles['Normal'])
-    story.append(date_para)
-    story.append(Spacer(1, 30))
+    # Content paragraphs, split on blank lines in one regex pass; the body is stripped
+    # and the split eats surrounding whitespace, so no per-paragraph strip() is needed
+    para_texts = (LINE_BREAK_RE.sub(' ', paragraph) for paragraph in PARAGRAPH_SPLIT_RE.split(body))
     
-    # Sort chunks by day number
-    sorted_chunks = sorted(chunks, key=lambda x: x["day"])
+    # Day header if found, then the paragraphs (escaped for ReportLab)
+    rl = _load_reportlab()
+    fragment = [rl.Paragraph(day_header.translate(ESCAPE_TABLE), rl.day_header_style)] if day_header else []
+    fragment += [rl.Paragraph(para_text.translate(ESCAPE_TABLE), rl.body_style) for para_text in para_texts if para_text]
+    return fragment
+
+
+def write_pdf(chunks: List[Dict], title: str, fp: BinaryIO) -> int:
+    """
+    Create a PDF from edited chunks using ReportLab and write it to a file object.
+    Lets callers stream to disk or a response without an intermediate bytes copy.
     
-    # Add each chunk to the story
-    for i, chunk in enumerate(sorted_chunks):
-        chunk_text = chunk["text"].strip()
+    Args:
+        chunks (List[Dict]): List of edited chunks
+        title (str): Title for the PDF document
+        fp (BinaryIO): Writable binary file object that receives the PDF
         
-        if chunk_text:
-            # Split chunk into lines
-            lines = chunk_text.split('\n')
-            
-            # Look for day header (first line starting with "Day")
-            day_header = None
-            content_lines = []
-            
-            for line in lines:
-                if line.strip().startswith('Day ') and day_header is None:
-                    day_header = line.strip()
-                else:
-                    content_lines.append(line)
-            
-            # Add day header if found
-            if day_header:
-                story.append(Paragraph(day_header, day_header_style))
-            
-            # Add content paragraphs
-            current_paragraph = []
-            for line in content_lines:
-                line = line.strip()
-                if line:  # Non-empty line
-                    current_paragraph.append(line)
-                else:  # Empty line - end current paragraph
-                    if current_paragraph:
-                        para_text = ' '.join(current_paragraph)
-                        # Escape special characters for ReportLab
-                        para_text = para_text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                        story.append(Paragraph(para_text, body_style))
-                        current_paragraph = []
-            
-            # Add final paragraph if exists
-            if current_paragraph:
-                para_text = ' '.join(current_paragraph)
-                para_text = para_text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                story.append(Paragraph(para_text, body_style))
+    Returns:
+        int: Number of pages written
+    """
+    rl = _load_reportlab()
+    inch = rl.inch
+    
+    # Create PDF document with A4 portrait format
+    doc = rl.SimpleDocTemplate(
+        fp,
+        pagesize=rl.A4,
+        topMargin=1*inch,
+        bottomMargin=1*inch,
+        leftMargin=1*inch,
+        rightMargin=1*inch
+    )
+    
+    # Build the story (content for PDF), starting with the title and generation date
+    story = [
+        rl.Paragraph(title, rl.title_style),
+        rl.Spacer(1, 20),
+        rl.Paragraph(f"Generated on {generation_date()}", rl.normal_style),
+        rl.Spacer(1, 30)
+    ]
+    
+    # Sort chunks by day number (once) and strip each text once
+    prepared = list(map(_prepare_chunk, sorted(chunks, key=BY_DAY)))
+    
+    # Add each chunk's fragment to the story in day order
+    last_index = len(prepared) - 1
+    for i, chunk_text in enumerate(prepared):
+        fragment = _build_chunk_fragment(chunk_text)
+        if fragment:
+            story.extend(fragment)
             
             # Add spacing between days (except for last chunk)
-            if i < len(sorted_chunks) - 1:
-                story.append(Spacer(1, 24))  # Two blank lines equivalent
+            if i < last_index:
+                story.append(rl.Spacer(1, 24))  # Two blank lines equivalent
     
     # Build PDF
     doc.build(story)
+    return doc.page
+
+
+@lru_cache(maxsize=8)
+def _empty_pdf(title: str, date_str: str) -> Tuple[bytes, int]:
+    """
+    Build (once per title and day) the PDF for chunks with no text: title and date only.
+    
+    Args:
+        title (str): Title for the PDF document
+        date_str (str): Generation date, so a cached PDF is never served on a later day
+        
+    Returns:
+        Tuple[bytes, int]: PDF content as bytes and its page count
+    """
+    buffer = io.BytesIO()
+    page_count = write_pdf([], title, buffer)
+    return buffer.getvalue(), page_count
+
+
+def build_and_count(chunks: List[Dict], title: str = "Enhanced Journal") -> Tuple[bytes, int]:
+    """
+    Create a PDF from edited chunks and report its exact page count.
     
-    # Get PDF bytes
-    buffer.seek(0)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
+    Args:
+        chunks (List[Dict]): List of edited chunks
+        title (str): Title for the PDF document
+        
+    Returns:
+        Tuple[bytes, int]: PDF content as bytes and its page count
+    """
+    # Nothing to lay out beyond the title page; reuse the cached document
+    if not any(chunk["text"].strip() for chunk in chunks):
+        return _empty_pdf(title, generation_date())
     
-    return pdf_bytes
+    buffer = io.BytesIO()
+    page_count = write_pdf(chunks, title, buffer)
+    
+    # getvalue() returns the whole buffer regardless of the current position
+    return buffer.getvalue(), page_count
+
+
+def create_pdf_bytes(chunks: List[Dict], title: str = "Enhanced Journal") -> bytes:
+    """
+    Create a PDF from edited chunks using ReportLab.
+    Returns in-memory bytes for download (no disk I/O).
+    
+    Args:
+        chunks (List[Dict]): List of edited chunks
+        title (str): Title for the PDF document
+        
+    Returns:
+        bytes: PDF content as bytes
+    """
+    return build_and_count(chunks, title)[0]
 
 
 def get_pdf_filename(chunks: List[Dict]) -> str:
@@ -190,10 +309,10 @@ def get_pdf_filename(chunks: List[Dict]) -> str:
     if not chunks:
         return "enhanced_journal.pdf"
     
-    # Sort chunks to get day range
-    sorted_chunks = sorted(chunks, key=lambda x: x["day"])
-    first_day = sorted_chunks[0]["day"]
-    last_day = sorted_chunks[-1]["day"]
+    # Day range straight from the day numbers; no need to sort the chunks
+    days = list(map(BY_DAY, chunks))
+    first_day = min(days)
+    last_day = max(days)
     
     if first_day == last_day:
         return f"enhanced_journal_day_{first_day}.pdf"
@@ -212,18 +331,12 @@ def get_pdf_stats(chunks: List[Dict]) -> Dict[str, any]:
         Dict: Statistics about the PDF
     """
     if not chunks:
-        return {"entries": 0, "words": 0, "characters": 0}
+        return {"entries": 0, "words": 0, "characters": 0, "estimated_pages": 0}
     
-    total_words = 0
-    total_chars = 0
-    
-    for chunk in chunks:
-        text = chunk["text"]
-        words = len(text.split())
-        chars = len(text)
-        
-        total_words += words
-        total_chars += chars
+    # str.split() runs in C, so one split per text beats iterating regex matches
+    texts = list(map(CHUNK_TEXT, chunks))
+    total_words = sum(map(len, map(str.split, texts)))
+    total_chars = sum(map(len, texts))
     
     return {
         "entries": len(chunks),
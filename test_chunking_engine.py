@@ -0,0 +1,111 @@
+"""
+Unit tests for chunking engine module.
+Tests daily journal parsing and paragraph chunking on sample text.
+"""
+
+import unittest
+import os
+from chunking_engine import (
+    parse_journal_entries,
+    chunk_by_paragraphs,
+    chunk_document_text,
+    get_chunk_summary
+)
+
+
+class TestChunkingEngine(unittest.TestCase):
+    """Test cases for chunking engine functionality."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures before running tests."""
+        cls.test_txt_path = 'test_fixtures/sample_journal.txt'
+        
+        # Read sample journal content
+        if os.path.exists(cls.test_txt_path):
+            with open(cls.test_txt_path, 'r', encoding='utf-8') as f:
+                cls.sample_content = f.read()
+        else:
+            cls.sample_content = ""
+    
+    def test_parse_sample_journal(self):
+        """Test parsing the sample journal into day entries."""
+        if not self.sample_content:
+            self.skipTest(f"Test fixture {self.test_txt_path} not found.")
+        
+        entries = parse_journal_entries(self.sample_content)
+        
+        self.assertEqual([entry["day"] for entry in entries], [1, 2, 3], "Should find Days 1-3 in order")
+        for entry in entries:
+            self.assertTrue(entry["text"].startswith(f"Day {entry['day']}"), "Entry should start with its header")
+            self.assertEqual(entry["text"], entry["text"].strip(), "Entry text should be stripped")
+    
+    def test_parse_header_variants(self):
+        """Test case-insensitive headers, indentation and trailing header text."""
+        text = "Preamble is ignored\n  day 1 - A Great Start\nFirst.\n\nDAY 2\nSecond.\nToday 3 is not a header\n"
+        
+        entries = parse_journal_entries(text)
+        
+        self.assertEqual(entries, [
+            {"day": 1, "text": "day 1 - A Great Start\nFirst."},
+            {"day": 2, "text": "DAY 2\nSecond.\nToday 3 is not a header"}
+        ])
+    
+    def test_parse_header_must_be_on_one_line(self):
+        """Test that "Day" and its number are not matched across a line break."""
+        entries = parse_journal_entries("Day 1\nDay\n2 is body text")
+        
+        self.assertEqual(entries, [{"day": 1, "text": "Day 1\nDay\n2 is body text"}])
+    
+    def test_parse_header_no_break_space(self):
+        """Test that a no-break space (common in PDF text) separates "Day" and its number."""
+        entries = parse_journal_entries("Day\xa07\nBody\nDay 8th is body text")
+        
+        self.assertEqual(entries, [{"day": 7, "text": "Day\xa07\nBody\nDay 8th is body text"}])
+    
+    def test_parse_no_entries(self):
+        """Test that text without day headers yields no entries."""
+        self.assertEqual(parse_journal_entries(""), [])
+        self.assertEqual(parse_journal_entries("Just some notes.\n\nNo headers here."), [])
+    
+    def test_chunk_by_paragraphs(self):
+        """Test grouping paragraphs into fixed-size chunks."""
+        text = "One\nline two\n\nTwo\n  \nThree\n\n\nFour\n\nFive"
+        
+        chunks = chunk_by_paragraphs(text, paragraphs_per_chunk=2)
+        
+        self.assertEqual(chunks, [
+            {"day": 1, "text": "One line two\n\nTwo"},
+            {"day": 2, "text": "Three\n\nFour"},
+            {"day": 3, "text": "Five"}
+        ])
+    
+    def test_chunk_by_paragraphs_keeps_inner_spacing(self):
+        """Test that lines are stripped and joined without collapsing spacing inside a line."""
+        chunks = chunk_by_paragraphs("  Two  spaces \r\n\tand a tab\n\nNext", paragraphs_per_chunk=5)
+        
+        self.assertEqual(chunks, [{"day": 1, "text": "Two  spaces and a tab\n\nNext"}])
+    
+    def test_chunk_by_paragraphs_empty(self):
+        """Test paragraph chunking of empty or whitespace-only text."""
+        self.assertEqual(chunk_by_paragraphs(""), [])
+        self.assertEqual(chunk_by_paragraphs(" \n\n \n"), [])
+    
+    def test_chunk_document_text_dispatch(self):
+        """Test that chunk_document_text dispatches on the method."""
+        text = "Day 1\n\nA\n\nB\n\nDay 2\n\nC"
+        
+        self.assertEqual(len(chunk_document_text(text, method="daily")), 2)
+        self.assertEqual(len(chunk_document_text(text, method="paragraph", paragraphs_per_chunk=1)), 5)
+    
+    def test_get_chunk_summary(self):
+        """Test summary strings for both chunking methods."""
+        chunks = [{"day": 1, "text": "a"}, {"day": 4, "text": "b"}]
+        
+        self.assertEqual(get_chunk_summary(chunks, method="daily"), "2 entries (Days 1-4)")
+        self.assertEqual(get_chunk_summary(chunks, method="paragraph"), "2 chunks")
+        self.assertEqual(get_chunk_summary([], method="daily"), "No entries found")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
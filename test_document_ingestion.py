@@ -5,6 +5,10 @@ Tests both PDF and DOCX extractors with 1-2 page fixtures.
 
 import unittest
 import os
+import io
+from pathlib import Path
+from docx import Document
+from docx.enum.text import WD_BREAK
 from document_ingestion import (
     detect_file_type,
     extract_text_from_pdf,
@@ -14,47 +18,59 @@ from document_ingestion import (
 )
 
 
+# Fixture paths and contents, checked and read once per process rather than per test
+_PDF_PATH = 'test_fixtures/sample_journal.pdf'
+_DOCX_PATH = 'test_fixtures/sample_journal.docx'
+_TXT_PATH = 'test_fixtures/sample_journal.txt'
+
+if os.path.exists(_TXT_PATH):
+    with open(_TXT_PATH, 'r', encoding='utf-8') as f:
+        _EXPECTED_CONTENT = f.read()
+else:
+    _EXPECTED_CONTENT = ""
+
+_HAS_FIXTURES = os.path.exists(_PDF_PATH) and os.path.exists(_DOCX_PATH)
+_SKIP_REASON = "Test fixtures not found. Run create_test_fixtures.py first."
+
+# (filename, expected type) pairs for detect_file_type
+_DETECT_CASES = [
+    ('document.pdf', 'pdf'),
+    ('Document.PDF', 'pdf'),
+    ('my_file.pdf', 'pdf'),
+    ('document.docx', 'docx'),
+    ('Document.DOCX', 'docx'),
+    ('my_file.docx', 'docx'),
+    ('document.txt', 'unknown'),
+    ('file.doc', 'unknown'),
+    ('image.jpg', 'unknown')
+]
+
+
 class TestDocumentIngestion(unittest.TestCase):
     """Test cases for document ingestion functionality."""
     
     @classmethod
     def setUpClass(cls):
         """Set up test fixtures before running tests."""
-        # Ensure test fixtures exist
-        cls.test_pdf_path = 'test_fixtures/sample_journal.pdf'
-        cls.test_docx_path = 'test_fixtures/sample_journal.docx'
-        cls.test_txt_path = 'test_fixtures/sample_journal.txt'
-        
-        # Read expected content
-        if os.path.exists(cls.test_txt_path):
-            with open(cls.test_txt_path, 'r', encoding='utf-8') as f:
-                cls.expected_content = f.read()
-        else:
-            cls.expected_content = ""
-    
-    def test_detect_file_type_pdf(self):
-        """Test file type detection for PDF files."""
-        self.assertEqual(detect_file_type('document.pdf'), 'pdf')
-        self.assertEqual(detect_file_type('Document.PDF'), 'pdf')
-        self.assertEqual(detect_file_type('my_file.pdf'), 'pdf')
+        cls.test_pdf_path = _PDF_PATH
+        cls.test_docx_path = _DOCX_PATH
+        cls.test_txt_path = _TXT_PATH
+        cls.expected_content = _EXPECTED_CONTENT
+        
+        # Read each fixture's bytes once for every test that extracts from bytes
+        if _HAS_FIXTURES:
+            cls._pdf_bytes = Path(_PDF_PATH).read_bytes()
+            cls._docx_bytes = Path(_DOCX_PATH).read_bytes()
     
-    def test_detect_file_type_docx(self):
-        """Test file type detection for DOCX files."""
-        self.assertEqual(detect_file_type('document.docx'), 'docx')
-        self.assertEqual(detect_file_type('Document.DOCX'), 'docx')
-        self.assertEqual(detect_file_type('my_file.docx'), 'docx')
-    
-    def test_detect_file_type_unknown(self):
-        """Test file type detection for unknown files."""
-        self.assertEqual(detect_file_type('document.txt'), 'unknown')
-        self.assertEqual(detect_file_type('file.doc'), 'unknown')
-        self.assertEqual(detect_file_type('image.jpg'), 'unknown')
+    def test_detect_file_type(self):
+        """Test file type detection for PDF, DOCX and unknown files."""
+        for path, expected in _DETECT_CASES:
+            with self.subTest(path=path):
+                self.assertEqual(detect_file_type(path), expected)
     
+    @unittest.skipUnless(_HAS_FIXTURES, _SKIP_REASON)
     def test_extract_pdf_from_path(self):
         """Test PDF text extraction from file path."""
-        if not os.path.exists(self.test_pdf_path):
-            self.skipTest(f"Test fixture {self.test_pdf_path} not found. Run create_test_fixtures.py first.")
-        
         text, success, file_type = extract_document_from_path(self.test_pdf_path)
         
         self.assertTrue(success, "PDF extraction should succeed")
@@ -67,11 +83,9 @@ class TestDocumentIngestion(unittest.TestCase):
         self.assertIn("Day 2", text, "Should contain Day 2 header")
         self.assertIn("Day 3", text, "Should contain Day 3 header")
     
+    @unittest.skipUnless(_HAS_FIXTURES, _SKIP_REASON)
     def test_extract_docx_from_path(self):
         """Test DOCX text extraction from file path."""
-        if not os.path.exists(self.test_docx_path):
-            self.skipTest(f"Test fixture {self.test_docx_path} not found. Run create_test_fixtures.py first.")
-        
         text, success, file_type = extract_document_from_path(self.test_docx_path)
         
         self.assertTrue(success, "DOCX extraction should succeed")
@@ -84,56 +98,68 @@ class TestDocumentIngestion(unittest.TestCase):
         self.assertIn("Day 2", text, "Should contain Day 2 header")
         self.assertIn("Day 3", text, "Should contain Day 3 header")
     
+    @unittest.skipUnless(_HAS_FIXTURES, _SKIP_REASON)
     def test_extract_pdf_bytes(self):
         """Test PDF text extraction from bytes."""
-        if not os.path.exists(self.test_pdf_path):
-            self.skipTest(f"Test fixture {self.test_pdf_path} not found. Run create_test_fixtures.py first.")
-        
-        # Read PDF as bytes
-        with open(self.test_pdf_path, 'rb') as f:
-            pdf_bytes = f.read()
-        
-        text, success = extract_text_from_pdf(pdf_bytes)
+        text, success = extract_text_from_pdf(self._pdf_bytes)
         
         self.assertTrue(success, "PDF bytes extraction should succeed")
         self.assertIsInstance(text, str, "Extracted text should be a string")
         self.assertGreater(len(text), 0, "Extracted text should not be empty")
     
+    @unittest.skipUnless(_HAS_FIXTURES, _SKIP_REASON)
     def test_extract_docx_bytes(self):
         """Test DOCX text extraction from bytes."""
-        if not os.path.exists(self.test_docx_path):
-            self.skipTest(f"Test fixture {self.test_docx_path} not found. Run create_test_fixtures.py first.")
-        
-        # Read DOCX as bytes
-        with open(self.test_docx_path, 'rb') as f:
-            docx_bytes = f.read()
-        
-        text, success = extract_text_from_docx(docx_bytes)
+        text, success = extract_text_from_docx(self._docx_bytes)
         
         self.assertTrue(success, "DOCX bytes extraction should succeed")
         self.assertIsInstance(text, str, "Extracted text should be a string")
         self.assertGreater(len(text), 0, "Extracted text should not be empty")
     
+    @unittest.skipUnless(_HAS_FIXTURES, _SKIP_REASON)
     def test_extract_document_text_integration(self):
         """Test the main extract_document_text function."""
-        if not os.path.exists(self.test_pdf_path):
-            self.skipTest(f"Test fixture {self.test_pdf_path} not found. Run create_test_fixtures.py first.")
-        
         # Test with PDF
-        with open(self.test_pdf_path, 'rb') as f:
-            pdf_bytes = f.read()
-        
-        text, success, file_type = extract_document_text(pdf_bytes, 'test.pdf')
+        text, success, file_type = extract_document_text(self._pdf_bytes, 'test.pdf')
         
         self.assertTrue(success, "PDF document extraction should succeed")
         self.assertEqual(file_type, 'pdf', "Should detect PDF file type")
         self.assertGreater(len(text), 0, "Should extract text content")
     
+    @unittest.skipUnless(_HAS_FIXTURES, _SKIP_REASON)
+    def test_extract_document_text_from_stream(self):
+        """Test extract_document_text with a binary file object instead of bytes."""
+        with open(self.test_docx_path, 'rb') as f:
+            text, success, file_type = extract_document_text(f, 'test.docx')
+        
+        self.assertTrue(success, "DOCX stream extraction should succeed")
+        self.assertEqual(file_type, 'docx', "Should detect DOCX file type")
+        self.assertIn("Day 1", text, "Should contain Day 1 header")
+    
+    def test_extract_docx_run_content(self):
+        """Test DOCX run content (tabs, breaks) and that only body paragraphs are read."""
+        doc = Document()
+        doc.add_heading('Day 1', level=2)
+        run = doc.add_paragraph('Tab\there ').add_run('line')
+        run.add_break()
+        run.add_text('break')
+        run.add_break(WD_BREAK.PAGE)
+        run.add_text('!')
+        doc.add_table(rows=1, cols=1).cell(0, 0).text = 'Table cell'
+        doc.add_paragraph('   ')
+        doc.add_paragraph('Fish & <chips>')
+        
+        docx_file = io.BytesIO()
+        doc.save(docx_file)
+        
+        text, success = extract_text_from_docx(docx_file.getvalue())
+        
+        self.assertTrue(success, "DOCX bytes extraction should succeed")
+        self.assertEqual(text, "Day 1\nTab\there line\nbreak!\nFish & <chips>")
+    
+    @unittest.skipUnless(_HAS_FIXTURES, _SKIP_REASON)
     def test_line_break_preservation(self):
         """Test that line breaks are preserved in extracted text."""
-        if not os.path.exists(self.test_docx_path):
-            self.skipTest(f"Test fixture {self.test_docx_path} not found. Run create_test_fixtures.py first.")
-        
         text, success, file_type = extract_document_from_path(self.test_docx_path)
         
         self.assertTrue(success, "DOCX extraction should succeed")
@@ -0,0 +1,400 @@
+"""
+Unit tests for OpenAI editor module.
+Tests prompt loading, packed request building and parsing, the edit cache and
+the async editing driver, with stub clients (no network calls).
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+import openai_editor
+from openai_editor import (
+    build_completion_params,
+    build_packed_content,
+    build_packed_params,
+    estimate_request_tokens,
+    check_batch,
+    parse_packed_response,
+    clear_cache,
+    load_system_prompt,
+    process_chunks_in_batches,
+    FALLBACK_SYSTEM_PROMPT
+)
+
+
+def stub_response(content):
+    """Build an object shaped like a chat completion response."""
+    message = type("Message", (), {"content": content})
+    choice = type("Choice", (), {"message": message})
+    return type("Response", (), {"choices": [choice]})
+
+
+class StubAsyncCompletions:
+    """
+    Async chat completions stub that upper-cases text, optionally dropping packed entries.
+    The first `failures` calls raise like an API error, and with `malformed` packed
+    requests get a reply that isn't JSON.
+    """
+
+    def __init__(self, drop_days=(), failures=0, malformed=False, clock=None):
+        self.drop_days = drop_days
+        self.failures = failures
+        self.malformed = malformed
+        self.clock = clock
+        self.calls = []
+        self.sent_at = []
+
+    async def create(self, **params):
+        self.calls.append(params)
+        if self.clock:
+            self.sent_at.append(self.clock.now)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Rate limit reached")
+
+        content = params["messages"][-1]["content"]
+        if "response_format" in params:
+            if self.malformed:
+                return stub_response("not json")
+            entries = [
+                {"day": entry["day"], "text": entry["text"].upper()}
+                for entry in json.loads(content)["entries"]
+                if entry["day"] not in self.drop_days
+            ]
+            content = json.dumps({"entries": entries})
+        else:
+            content = content.upper()
+
+        return stub_response(content)
+
+
+class StubAsyncClient:
+    """Minimal stand-in for AsyncOpenAI, usable as an async context manager."""
+    
+    def __init__(self, **options):
+        self.completions = StubAsyncCompletions(**options)
+        self.chat = type("Chat", (), {"completions": self.completions})
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeClock:
+    """Stand-in for the time module whose monotonic clock jumps ahead on every reading."""
+    
+    def __init__(self, step):
+        self.step = step
+        self.now = 0.0
+    
+    def monotonic(self):
+        self.now += self.step
+        return self.now
+
+
+class TestLoadSystemPrompt(unittest.TestCase):
+    """Test cases for reading the system prompt from the prompt file."""
+    
+    def setUp(self):
+        """Point the prompt file at a temporary file."""
+        prompt_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(prompt_dir.cleanup)
+        self.prompt_path = os.path.join(prompt_dir.name, 'openai-api.md')
+        prompt_path = mock.patch.object(openai_editor, 'SYSTEM_PROMPT_PATH', self.prompt_path)
+        prompt_path.start()
+        self.addCleanup(prompt_path.stop)
+        
+        # The parsed prompt is cached on the file's mtime, which temp files may share
+        openai_editor._parse_system_prompt.cache_clear()
+        self.addCleanup(openai_editor._parse_system_prompt.cache_clear)
+    
+    def write_prompt_file(self, content):
+        """Write the temporary prompt file."""
+        with open(self.prompt_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def test_json_payload(self):
+        """Test that the prompt is read from a reflowed JSON payload with escapes."""
+        payload = {
+            "model": "gpt-4.5-preview",
+            "messages": [
+                {"role": "system", "content": [
+                    {"type": "text", "text": 'You are a stylistic editor.\nKeep "quotes" \\ intact.'}
+                ]},
+                {"role": "user", "content": [{"type": "text", "text": "Day 1"}]}
+            ]
+        }
+        self.write_prompt_file(f"# Request\n\n```json\n{json.dumps(payload, indent=4)}\n```\n")
+        
+        self.assertEqual(load_system_prompt(), 'You are a stylistic editor.\nKeep "quotes" \\ intact.')
+    
+    def test_non_json_payload_falls_back_to_scan(self):
+        """Test that a payload that isn't valid JSON is still scanned for the prompt."""
+        self.write_prompt_file("client.create(messages=[{'role': 'system', 'content': "
+                               '[{"text": "You are a stylistic editor.\\nBe brief."}]}])')
+        
+        self.assertEqual(load_system_prompt(), "You are a stylistic editor.\nBe brief.")
+    
+    def test_missing_prompt_uses_fallback(self):
+        """Test that the built-in prompt is used when the file has no prompt."""
+        self.write_prompt_file('{"messages": []}')
+        
+        self.assertEqual(load_system_prompt(), FALLBACK_SYSTEM_PROMPT)
+
+
+class TestOpenAIEditor(unittest.TestCase):
+    """Test cases for building and parsing packed editing requests."""
+    
+    def setUp(self):
+        """Set up a small batch of chunks."""
+        self.chunks = [
+            {"day": 1, "text": "Day 1\nFirst."},
+            {"day": 2, "text": "Day 2\nSecond."},
+            {"day": 3, "text": "Day 3\nThird."}
+        ]
+    
+    def test_build_packed_params(self):
+        """Test that packed requests send a JSON entries array and ask for JSON back."""
+        params = build_packed_params("Edit this.", self.chunks)
+        
+        self.assertEqual(params["response_format"], {"type": "json_object"})
+        self.assertTrue(params["messages"][0]["content"].startswith("Edit this."))
+        self.assertEqual(json.loads(params["messages"][1]["content"]), {"entries": self.chunks})
+    
+    def test_estimate_request_tokens_counts_completion_cap(self):
+        """Test that the TPM estimate includes the max_completion_tokens OpenAI reserves."""
+        params = build_completion_params("abcd", "efgh")
+        
+        self.assertEqual(estimate_request_tokens(params), 3 + params["max_completion_tokens"])
+    
+    def test_parse_packed_response_maps_by_day(self):
+        """Test that entries are matched to pack positions by day, in any order."""
+        content = json.dumps({"entries": [
+            {"day": 3, "text": "three"},
+            {"day": "1", "text": "one"},
+            {"day": 7, "text": "unknown"}
+        ]})
+        
+        self.assertEqual(parse_packed_response(content, self.chunks), {0: "one", 2: "three"})
+    
+    def test_parse_packed_response_ignores_non_string_text(self):
+        """Test that null or structured text counts as missing rather than being stringified."""
+        content = json.dumps({"entries": [
+            {"day": 1, "text": None},
+            {"day": 2, "text": {"edited": "two"}},
+            {"day": 3, "text": "three"}
+        ]})
+        
+        self.assertEqual(parse_packed_response(content, self.chunks), {2: "three"})
+    
+    def test_parse_packed_response_repeated_days(self):
+        """Test that repeated day numbers are matched in order."""
+        chunks = [{"day": 1, "text": "a"}, {"day": 1, "text": "b"}]
+        content = build_packed_content([{"day": 1, "text": "A"}, {"day": 1, "text": "B"}])
+        
+        self.assertEqual(parse_packed_response(content, chunks), {0: "A", 1: "B"})
+    
+    def test_parse_packed_response_schema_mismatch(self):
+        """Test that malformed responses raise instead of returning partial results."""
+        for content in ("not json", '{"chunks": []}', '{"entries": [{"text": "x"}]}'):
+            with self.subTest(content=content):
+                with self.assertRaises((ValueError, KeyError, TypeError)):
+                    parse_packed_response(content, self.chunks)
+
+
+class TestEditAllChunks(unittest.TestCase):
+    """Test cases for the async editing driver, with a stub AsyncOpenAI client."""
+    
+    def setUp(self):
+        """Use an empty edit cache, no retry backoff and a stub async client."""
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        for name, value in (('EDIT_CACHE_PATH', os.path.join(cache_dir.name, 'edit_cache')),
+                            ('RETRY_BASE_DELAY', 0)):
+            patcher = mock.patch.object(openai_editor, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        self.client = StubAsyncClient()
+        patcher = mock.patch.object(openai_editor, 'create_async_openai_client', lambda: self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.chunks = [
+            {"day": 1, "text": "Day 1\nFirst."},
+            {"day": 2, "text": "Day 2\nSecond."},
+            {"day": 3, "text": "Day 3\nThird."}
+        ]
+    
+    def edit_all(self, **kwargs):
+        """Run the driver, failing (rather than hanging) if it doesn't finish."""
+        return asyncio.run(asyncio.wait_for(
+            openai_editor._edit_all_chunks(self.chunks, "Edit this.", **kwargs), timeout=10
+        ))
+    
+    def expected(self, edited=True):
+        """Results for self.chunks, upper-cased by the stub when edited."""
+        return [
+            {"day": chunk["day"], "text": chunk["text"].upper() if edited else chunk["text"], "edited": edited}
+            for chunk in self.chunks
+        ]
+    
+    def test_process_chunks_packed(self):
+        """Test that the public entry point edits a pack with one JSON request and reports progress."""
+        messages = []
+        
+        results = process_chunks_in_batches(self.chunks, system_prompt="Edit this.",
+                                            progress_callback=messages.append, pack_size=3)
+        
+        self.assertEqual(results, self.expected())
+        self.assertEqual(len(self.client.completions.calls), 1)
+        self.assertIn("response_format", self.client.completions.calls[0])
+        self.assertTrue(messages[0].startswith("Sending 3 entries"))
+        self.assertEqual(messages[-1], "Edited 3/3 entries …")
+    
+    def test_api_error_is_retried(self):
+        """Test that a failed request is sent again after its backoff."""
+        self.client = StubAsyncClient(failures=1)
+        
+        results = self.edit_all(pack_size=3)
+        
+        self.assertEqual(results, self.expected())
+        self.assertEqual(len(self.client.completions.calls), 2)
+    
+    def test_gives_up_after_max_attempts(self):
+        """Test that chunks keep their original text once every attempt has failed."""
+        self.client = StubAsyncClient(failures=100)
+        
+        results = self.edit_all(pack_size=3, max_attempts=2)
+        
+        self.assertEqual(results, self.expected(edited=False))
+        self.assertEqual(len(self.client.completions.calls), 2)
+    
+    def test_partial_packed_reply_falls_back_per_chunk(self):
+        """Test that a chunk missing from the packed reply is sent on its own."""
+        self.client = StubAsyncClient(drop_days=(2,))
+        
+        results = self.edit_all(pack_size=3)
+        
+        self.assertEqual(results, self.expected())
+        calls = self.client.completions.calls
+        self.assertEqual(len(calls), 2)
+        self.assertNotIn("response_format", calls[1])
+        self.assertEqual(calls[1]["messages"][1]["content"], self.chunks[1]["text"])
+    
+    def test_malformed_packed_reply_falls_back_per_chunk(self):
+        """Test that a packed reply that isn't JSON sends every chunk on its own."""
+        self.client = StubAsyncClient(malformed=True)
+        
+        results = self.edit_all(pack_size=3)
+        
+        self.assertEqual(results, self.expected())
+        self.assertEqual(len(self.client.completions.calls), 4)
+    
+    def test_edit_cache(self):
+        """Test that cached edits need no client until the prompt changes or the cache is cleared."""
+        first = self.edit_all(pack_size=3)
+        
+        messages = []
+        with mock.patch.object(openai_editor, 'create_async_openai_client', side_effect=AssertionError):
+            cached = self.edit_all(pack_size=3, progress_callback=messages.append)
+        self.assertEqual(cached, first)
+        self.assertEqual(messages, ["Edited 3/3 entries …"])
+        
+        self.client = StubAsyncClient()
+        asyncio.run(openai_editor._edit_all_chunks(self.chunks[:1], "Edit differently."))
+        self.assertEqual(len(self.client.completions.calls), 1, "A new prompt should miss the cache")
+        
+        clear_cache()
+        self.client = StubAsyncClient()
+        self.edit_all(pack_size=3)
+        self.assertEqual(len(self.client.completions.calls), 1, "Cleared cache should send the pack again")
+    
+    def test_request_rate_limit(self):
+        """Test that requests are spaced out to the requests-per-minute limit."""
+        clock = FakeClock(step=10)
+        self.client = StubAsyncClient(clock=clock)
+        
+        with mock.patch.object(openai_editor, 'time', clock):
+            results = self.edit_all(pack_size=1, max_requests_per_minute=1)
+        
+        self.assertEqual(results, self.expected())
+        sent_at = self.client.completions.sent_at
+        self.assertEqual(len(sent_at), 3)
+        self.assertTrue(all(later - earlier >= 60 for earlier, later in zip(sent_at, sent_at[1:])))
+    
+    def test_token_rate_limit(self):
+        """Test that a request estimated to use a minute's token budget waits for it to refill."""
+        clock = FakeClock(step=10)
+        self.client = StubAsyncClient(clock=clock)
+        
+        with mock.patch.object(openai_editor, 'time', clock):
+            results = self.edit_all(pack_size=1, max_tokens_per_minute=5)
+        
+        self.assertEqual(results, self.expected())
+        sent_at = self.client.completions.sent_at
+        self.assertTrue(all(later - earlier >= 60 for earlier, later in zip(sent_at, sent_at[1:])))
+    
+    def test_raising_progress_callback_stops_editing(self):
+        """Test that an exception from the progress callback ends the run instead of stalling it."""
+        class StopEditing(BaseException):
+            """Stands in for Streamlit's StopException, which isn't an Exception."""
+        
+        def progress_callback(message):
+            raise StopEditing(message)
+        
+        with self.assertRaises(StopEditing):
+            self.edit_all(progress_callback=progress_callback, pack_size=3)
+
+
+class TestCheckBatch(unittest.TestCase):
+    """Test cases for collecting Batch API results without waiting."""
+    
+    def setUp(self):
+        """Set up submitted chunks and a stub client for a batch job."""
+        self.chunks = [{"day": 1, "text": "Day 1\nFirst."}, {"day": 2, "text": "Day 2\nSecond."}]
+        self.batch = SimpleNamespace(status="in_progress", output_file_id=None,
+                                     request_counts=SimpleNamespace(completed=1, failed=0))
+        output = "\n".join(json.dumps(result) for result in (
+            {"custom_id": "chunk-1", "response": {"status_code": 200, "body": {
+                "choices": [{"message": {"content": "DAY 2\nSECOND."}}]
+            }}},
+            {"custom_id": "chunk-0", "response": {"status_code": 500}, "error": "server error"}
+        ))
+        client = SimpleNamespace(
+            batches=SimpleNamespace(retrieve=lambda batch_id: self.batch),
+            files=SimpleNamespace(content=lambda file_id: SimpleNamespace(text=output))
+        )
+        patcher = mock.patch.object(openai_editor, 'create_openai_client', lambda: client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_running_batch_returns_none(self):
+        """Test that a running batch reports its progress and returns right away."""
+        messages = []
+        
+        self.assertIsNone(check_batch("batch_1", self.chunks, progress_callback=messages.append))
+        self.assertEqual(messages, ["Edited 1/2 entries … (batch in_progress)"])
+    
+    def test_finished_batch_maps_results(self):
+        """Test that results map back by custom_id and failed requests keep the original text."""
+        self.batch.status = "completed"
+        self.batch.output_file_id = "file_1"
+        
+        with mock.patch('builtins.print'):
+            results = check_batch("batch_1", self.chunks)
+        
+        self.assertEqual(results, [
+            {"day": 1, "text": "Day 1\nFirst.", "edited": False},
+            {"day": 2, "text": "DAY 2\nSECOND.", "edited": True}
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
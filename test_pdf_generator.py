@@ -0,0 +1,125 @@
+"""
+Unit tests for PDF generator module.
+Tests chunk concatenation, PDF rendering and statistics on small sample chunks.
+"""
+
+import unittest
+import tempfile
+import pypdfium2 as pdfium
+from pdf_generator import (
+    concatenate_chunks,
+    create_pdf_bytes,
+    build_and_count,
+    write_pdf,
+    get_pdf_filename,
+    get_pdf_stats
+)
+
+
+def pdf_text(pdf_bytes: bytes) -> str:
+    """Extract the text of every page of a generated PDF."""
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        return '\n'.join(page.get_textpage().get_text_range() for page in pdf)
+    finally:
+        pdf.close()
+
+
+class TestPdfGenerator(unittest.TestCase):
+    """Test cases for PDF generator functionality."""
+    
+    def setUp(self):
+        """Set up sample chunks, deliberately out of order."""
+        self.chunks = [
+            {"day": 2, "text": "Day 2\n\nSecond entry,\nwrapped line.\n\nAnother paragraph."},
+            {"day": 1, "text": "Day 1 - Fish & <Chips>\n\nFirst entry with 5 < 6 & 7 > 3."}
+        ]
+    
+    def test_concatenate_chunks(self):
+        """Test that chunks are concatenated in day order with blank lines between days."""
+        text = concatenate_chunks(self.chunks)
+        
+        self.assertTrue(text.startswith("Day 1 - Fish"), "Day 1 should come first")
+        self.assertIn("3.\n\n\n\nDay 2", text, "Days should be separated by two blank lines")
+        self.assertEqual(concatenate_chunks([]), "")
+        self.assertEqual(concatenate_chunks(self.chunks[::-1], already_sorted=True), text)
+    
+    def test_create_pdf_bytes(self):
+        """Test that the PDF renders in day order with markup characters escaped."""
+        pdf_bytes = create_pdf_bytes(self.chunks, "Test Journal")
+        
+        self.assertTrue(pdf_bytes.startswith(b"%PDF"), "Output should be a PDF")
+        text = pdf_text(pdf_bytes)
+        self.assertIn("Test Journal", text)
+        self.assertIn("Day 1 - Fish & <Chips>", text, "Header should be escaped, not parsed as markup")
+        self.assertIn("First entry with 5 < 6 & 7 > 3.", text)
+        self.assertIn("Second entry, wrapped line.", text, "Lines of a paragraph should be joined")
+        self.assertLess(text.index("Day 1"), text.index("Day 2"), "Days should be in order")
+    
+    def test_only_first_line_is_day_header(self):
+        """Test that a "Day" line after the first stays in the body paragraph."""
+        chunks = [{"day": 1, "text": "Notes from the week\nDay 5 was quiet."}]
+        
+        text = pdf_text(create_pdf_bytes(chunks))
+        
+        self.assertIn("Notes from the week Day 5 was quiet.", text)
+    
+    def test_create_pdf_bytes_many_chunks(self):
+        """Test that a long journal given out of order is written in day order."""
+        chunks = [{"day": day, "text": f"Day {day}\n\nEntry number {day}."} for day in range(40, 0, -1)]
+        
+        text = pdf_text(create_pdf_bytes(chunks))
+        
+        positions = [text.index(f"Entry number {day}.") for day in range(1, 41)]
+        self.assertEqual(positions, sorted(positions), "Days should be in order")
+    
+    def test_create_pdf_bytes_empty(self):
+        """Test that chunks without text give the title-only PDF, built once and reused."""
+        pdf_bytes = create_pdf_bytes([], "Empty Journal")
+        
+        self.assertTrue(pdf_bytes.startswith(b"%PDF"), "Output should be a PDF")
+        self.assertIn("Empty Journal", pdf_text(pdf_bytes))
+        self.assertIs(create_pdf_bytes([{"day": 1, "text": " \n "}], "Empty Journal"), pdf_bytes)
+    
+    def test_build_and_count(self):
+        """Test that build_and_count reports the exact page count of the PDF it builds."""
+        chunks = [{"day": day, "text": f"Day {day}\n\n" + "Words on a page. " * 400} for day in range(1, 4)]
+        
+        pdf_bytes, page_count = build_and_count(chunks)
+        
+        pdf = pdfium.PdfDocument(pdf_bytes)
+        try:
+            self.assertEqual(page_count, len(pdf))
+        finally:
+            pdf.close()
+        self.assertGreater(page_count, 1)
+    
+    def test_write_pdf(self):
+        """Test writing the PDF straight to a file object."""
+        with tempfile.TemporaryFile() as fp:
+            write_pdf(self.chunks, "Streamed Journal", fp)
+            fp.seek(0)
+            pdf_bytes = fp.read()
+        
+        self.assertTrue(pdf_bytes.startswith(b"%PDF"), "Output should be a PDF")
+        self.assertIn("Streamed Journal", pdf_text(pdf_bytes))
+    
+    def test_get_pdf_filename(self):
+        """Test filenames for empty, single-day and multi-day chunks."""
+        self.assertEqual(get_pdf_filename([]), "enhanced_journal.pdf")
+        self.assertEqual(get_pdf_filename(self.chunks[:1]), "enhanced_journal_day_2.pdf")
+        self.assertEqual(get_pdf_filename(self.chunks), "enhanced_journal_days_1-2.pdf")
+    
+    def test_get_pdf_stats(self):
+        """Test entry, word and character counts."""
+        stats = get_pdf_stats(self.chunks)
+        
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["words"], sum(len(chunk["text"].split()) for chunk in self.chunks))
+        self.assertEqual(stats["characters"], sum(len(chunk["text"]) for chunk in self.chunks))
+        self.assertEqual(stats["estimated_pages"], 1)
+        self.assertEqual(get_pdf_stats([]), {"entries": 0, "words": 0, "characters": 0, "estimated_pages": 0})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)